@@ -1,138 +1,21 @@
-import sqlite3
 import tkinter as tk
+import threading
 from tkinter import messagebox, ttk, Toplevel, filedialog, simpledialog
-import csv
-
-def connect_to_database():
-    return sqlite3.connect('assets.db')
-
-def create_tables():
-    connection = connect_to_database()
-    with connection:
-        connection.execute('''
-            CREATE TABLE IF NOT EXISTS Assets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                value DECIMAL(10, 2) NOT NULL,
-                responsible_person TEXT,
-                purchase_place TEXT,
-                city TEXT NOT NULL,
-                street TEXT NOT NULL,
-                building_number TEXT NOT NULL,
-                room TEXT NOT NULL,
-                date_received TEXT NOT NULL
-            )
-        ''')
-        connection.execute('''
-            CREATE TABLE IF NOT EXISTS Employees (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                position TEXT NOT NULL,
-                hire_date TEXT NOT NULL,
-                department TEXT,
-                supervisor TEXT,
-                salary DECIMAL(10, 2) NOT NULL
-            )
-        ''')
-        cursor = connection.cursor()
-        cursor.execute("PRAGMA table_info(Assets)")
-        columns = [info[1] for info in cursor.fetchall()]
-        if 'date_received' not in columns:
-            connection.execute("ALTER TABLE Assets ADD COLUMN date_received TEXT NOT NULL DEFAULT '01-01-2000'")
-        
-        cursor.execute("PRAGMA table_info(Employees)")
-        columns = [info[1] for info in cursor.fetchall()]
-        if 'department' not in columns:
-            connection.execute("ALTER TABLE Employees ADD COLUMN department TEXT")
-        if 'supervisor' not in columns:
-            connection.execute("ALTER TABLE Employees ADD COLUMN supervisor TEXT")
-        if 'salary' not in columns:
-            connection.execute("ALTER TABLE Employees ADD COLUMN salary DECIMAL(10, 2) NOT NULL DEFAULT 0.0")
-    connection.close()
-
-def add_asset(name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received):
-    connection = connect_to_database()
-    with connection:
-        connection.execute('''
-            INSERT INTO Assets (
-                name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received))
-    connection.close()
-
-def update_asset(asset_id, name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received):
-    connection = connect_to_database()
-    with connection:
-        connection.execute('''
-            UPDATE Assets SET
-                name = ?, description = ?, value = ?, responsible_person = ?, purchase_place = ?, city = ?, street = ?, building_number = ?, room = ?, date_received = ?
-            WHERE id = ?
-        ''', (name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received, asset_id))
-    connection.close()
-
-def delete_asset(asset_id):
-    connection = connect_to_database()
-    with connection:
-        connection.execute("DELETE FROM Assets WHERE id = ?", (asset_id,))
-    connection.close()
-
-def add_employee(name, position, hire_date, department, supervisor, salary):
-    connection = connect_to_database()
-    with connection:
-        connection.execute('''
-            INSERT INTO Employees (name, position, hire_date, department, supervisor, salary) VALUES (?, ?, ?, ?, ?, ?)
-        ''', (name, position, hire_date, department, supervisor, salary))
-    connection.close()
-
-def update_employee(employee_id, name, position, hire_date, department, supervisor, salary):
-    connection = connect_to_database()
-    with connection:
-        connection.execute('''
-            UPDATE Employees SET
-                name = ?, position = ?, hire_date = ?, department = ?, supervisor = ?, salary = ?
-            WHERE id = ?
-        ''', (name, position, hire_date, department, supervisor, salary, employee_id))
-    connection.close()
-
-def delete_employee(employee_id):
-    connection = connect_to_database()
-    with connection:
-        connection.execute("DELETE FROM Employees WHERE id = ?", (employee_id,))
-    connection.close()
-
-def display_assets(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None):
-    connection = connect_to_database()
-    with connection:
-        cursor = connection.cursor()
-        query = "SELECT * FROM Assets"
-        clauses = []
-        if filters:
-            filter_clauses = [f"{column} LIKE '%{value}%'" for column, value in filters.items() if value]
-            clauses.extend(filter_clauses)
-        if value_range:
-            min_value, max_value = value_range
-            clauses.append(f"value BETWEEN {min_value} AND {max_value}")
-        if date_range:
-            start_date, end_date = date_range
-            clauses.append(f"date_received BETWEEN '{start_date}' AND '{end_date}'")
-        if clauses:
-            query += " WHERE " + " AND ".join(clauses)
-        if sort_by:
-            query += f" ORDER BY {sort_by} {sort_order}"
-        cursor.execute(query)
-        assets = cursor.fetchall()
-    connection.close()
-    return assets
-
-def display_employees():
-    connection = connect_to_database()
-    with connection:
-        cursor = connection.cursor()
-        cursor.execute("SELECT * FROM Employees")
-        employees = cursor.fetchall()
-    connection.close()
-    return employees
+from asset_management import database
+from asset_management.assets import add_asset, update_asset, update_assets, update_assets_where, delete_asset, delete_assets, delete_assets_where, get_asset_by_id, count_assets, fetch_asset_page
+from asset_management.employees import add_employee, update_employee, update_employees, delete_employee, delete_employees, get_employee_by_id, count_employees, fetch_employee_page
+from asset_management.directory import employee_directory
+from asset_management.schema import create_tables
+from asset_management.csv_io import import_assets_csv, import_employees_csv, export_assets_csv, export_employees_csv, sync_assets_csv
+from asset_management.queries import ASSET_SORT_COLUMNS, EMPLOYEE_SORT_COLUMNS, SORT_ORDERS, normalize_sort
+from asset_management.dates import to_iso_date
+from asset_management.money import from_cents, to_cents
+from asset_management.tasks import TaskCancelled, TaskExecutor
+from asset_management.live_filter import LIVE_RESULT_LIMIT, live_assets, narrows
+from asset_management.instrumentation import configure_slow_query_log, format_cache_stats, query_stats
+from asset_management.reporting import ROLLUP_DIMENSIONS, rebuild_rollups, rollup_report
+from asset_management.result_cache import asset_cache
+from virtual_tree import VirtualTreeview
 
 def add_asset_command():
     name = name_entry.get()
@@ -148,14 +31,24 @@ def add_asset_command():
     day = day_var.get()
     month = month_var.get()
     year = year_var.get()
-    date_received = f"{day}-{month}-{year}"
 
     if not (name and value and city and street and building_number and room and day and month and year):
         messagebox.showerror("Error", "Fields marked with * are mandatory!")
         return
 
-    add_asset(name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received)
-    messagebox.showinfo("Success", "Asset added successfully")
+    try:
+        date_received = to_iso_date(f"{day}-{month}-{year}")
+    except ValueError:
+        messagebox.showerror("Error", "Date Received is not a valid date!")
+        return
+    try:
+        value = to_cents(value)
+    except ValueError:
+        messagebox.showerror("Error", "Value is not a valid amount!")
+        return
+
+    executor.submit(add_asset, name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received,
+                    write=True, on_done=lambda asset_id: messagebox.showinfo("Success", "Asset added successfully"), on_error=show_task_error)
 
 def add_employee_command():
     name = employee_name_entry.get()
@@ -167,54 +60,74 @@ def add_employee_command():
     day = emp_day_var.get()
     month = emp_month_var.get()
     year = emp_year_var.get()
-    hire_date = f"{day}-{month}-{year}"
 
     if not (name and position and department and salary and day and month and year):
         messagebox.showerror("Error", "Fields marked with * are mandatory!")
         return
 
-    add_employee(name, position, hire_date, department, supervisor, salary)
-    messagebox.showinfo("Success", "Employee added successfully")
+    try:
+        hire_date = to_iso_date(f"{day}-{month}-{year}")
+    except ValueError:
+        messagebox.showerror("Error", "Hire Date is not a valid date!")
+        return
+    try:
+        salary = to_cents(salary)
+    except ValueError:
+        messagebox.showerror("Error", "Salary is not a valid amount!")
+        return
+
+    executor.submit(add_employee, name, position, hire_date, department, supervisor, salary,
+                    write=True, on_done=lambda employee_id: messagebox.showinfo("Success", "Employee added successfully"), on_error=show_task_error)
 
-def show_assets(assets, title="Assets"):
-    if not assets:
+def show_assets(title="Assets", sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, total=None):
+    if total is None:
+        total = count_assets(filters, value_range, date_range)
+    if not total:
         messagebox.showinfo(title, "No assets found")
         return
     top = Toplevel(root)
     top.title(title)
-    tree = ttk.Treeview(top)
-    tree["columns"] = ("ID", "Name", "Description", "Value", "Responsible Person", "Purchase Place", "City", "Street", "Building Number", "Room", "Date Received")
-    for col in tree["columns"]:
-        tree.heading(col, text=col)
-        tree.column(col, width=120)
-    for asset in assets:
-        tree.insert("", "end", values=asset)
+    tree = VirtualTreeview(
+        top, ASSET_SORT_COLUMNS, ASSET_HEADINGS,
+        count_rows=lambda: count_assets(filters, value_range, date_range),
+        fetch_rows=lambda sort_by, sort_order, limit, offset, after: fetch_asset_page(sort_by, sort_order, filters, value_range, date_range, limit, offset, after),
+        sort_by=sort_by, sort_order=sort_order, total=total,
+        format_row=format_asset_row
+    )
     tree.pack(fill=tk.BOTH, expand=1)
-    scrollbar = ttk.Scrollbar(top, orient="vertical", command=tree.yview)
-    tree.configure(yscroll=scrollbar.set)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    return tree
+
+def format_asset_row(row):
+    return row[:3] + (from_cents(row[3]),) + row[4:]
 
-def show_employees(employees, title="Employees"):
-    if not employees:
+def show_employees(title="Employees"):
+    if not count_employees():
         messagebox.showinfo(title, "No employees found")
         return
     top = Toplevel(root)
     top.title(title)
-    tree = ttk.Treeview(top)
-    tree["columns"] = ("ID", "Name", "Position", "Hire Date", "Department", "Supervisor", "Salary")
-    for col in tree["columns"]:
-        tree.heading(col, text=col)
-        tree.column(col, width=120)
-    for employee in employees:
-        tree.insert("", "end", values=employee)
+    tree = VirtualTreeview(
+        top, EMPLOYEE_SORT_COLUMNS,
+        ("ID", "Name", "Position", "Hire Date", "Department", "Supervisor", "Salary"),
+        count_rows=count_employees,
+        fetch_rows=fetch_employee_page,
+        format_row=lambda row: row[:6] + (from_cents(row[6]),)
+    )
     tree.pack(fill=tk.BOTH, expand=1)
-    scrollbar = ttk.Scrollbar(top, orient="vertical", command=tree.yview)
-    tree.configure(yscroll=scrollbar.set)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    return tree
+
+def read_asset_filter_form(report_errors=True):
+    def report(message):
+        if report_errors:
+            messagebox.showerror("Error", message)
 
-def display_assets_command():
     sort_by = sort_by_combobox.get()
     sort_order = sort_order_combobox.get()
+    try:
+        sort_by, sort_order = normalize_sort(sort_by, sort_order)
+    except ValueError as error:
+        report(f"{error}. Sorting was ignored.")
+        sort_by, sort_order = None, None
     filters = {
         "name": name_filter_entry.get(),
         "description": description_filter_entry.get(),
@@ -228,7 +141,18 @@ def display_assets_command():
     }
     min_value = min_value_entry.get()
     max_value = max_value_entry.get()
-    value_range = (min_value, max_value) if min_value and max_value else None
+    value_range = None
+    if filters["value"]:
+        try:
+            filters["value"] = to_cents(filters["value"])
+        except ValueError:
+            report("Value filter is not a valid amount and was ignored.")
+            filters["value"] = ""
+    if min_value and max_value:
+        try:
+            value_range = (to_cents(min_value), to_cents(max_value))
+        except ValueError:
+            report("Value range is not a valid pair of amounts and was ignored.")
 
     start_day = start_day_var.get()
     start_month = start_month_var.get()
@@ -240,16 +164,83 @@ def display_assets_command():
     start_date = f"{start_day}-{start_month}-{start_year}" if start_day and start_month and start_year else None
     end_date = f"{end_day}-{end_month}-{end_year}" if end_day and end_month and end_year else None
 
-    date_range = (start_date, end_date) if start_date and end_date else None
+    date_range = None
+    if start_date and end_date:
+        try:
+            date_range = (to_iso_date(start_date), to_iso_date(end_date))
+        except ValueError:
+            report("Date range is not valid and was ignored.")
 
-    assets = display_assets(sort_by, sort_order, filters, value_range, date_range)
-    show_assets(assets, title="Display Asset List")
+    return sort_by, sort_order, filters, value_range, date_range
+
+def display_assets_command():
+    run_live_filter(report_errors=True)
+
+def live_results_view():
+    global live_view
+    if live_view is None or not live_view[0].winfo_exists():
+        top = Toplevel(root)
+        top.title("Display Asset List")
+        status_label = tk.Label(top, anchor=tk.W)
+        status_label.pack(fill=tk.X, padx=5, pady=5)
+        tree = VirtualTreeview(top, ASSET_SORT_COLUMNS, ASSET_HEADINGS, count_rows=lambda: 0, fetch_rows=lambda *args: [], format_row=format_asset_row)
+        tree.pack(fill=tk.BOTH, expand=1)
+        live_view = (top, tree, status_label)
+    return live_view
+
+def schedule_live_filter(*args):
+    global live_filter_job
+    if live_filter_job is not None:
+        root.after_cancel(live_filter_job)
+    live_filter_job = root.after(LIVE_FILTER_DELAY, run_live_filter)
+
+def run_live_filter(report_errors=False):
+    global live_filter_job, live_query, live_results
+    if live_filter_job is not None:
+        root.after_cancel(live_filter_job)
+        live_filter_job = None
+    sort_by, sort_order, filters, value_range, date_range = read_asset_filter_form(report_errors)
+    options = ({column: value for column, value in filters.items() if value}, value_range, date_range)
+    if live_query is not None:
+        live_query.set()
+        live_query = None
+    generation = database.current_generation()
+    if live_results is not None and live_results[1] is not None and live_results[2] == generation and narrows(live_results[0], options):
+        memory = live_results[1].narrowed(options[0], live_results[0][0])
+        show_live_results(options, sort_by, sort_order, memory.count(), memory, live_results[2])
+        return
+    cancelled = threading.Event()
+    live_query = cancelled
+    live_results_view()[2].config(text="Searching...")
+
+    def finished(result):
+        if not cancelled.is_set():
+            show_live_results(options, sort_by, sort_order, *result, generation)
+
+    def failed(error):
+        if not cancelled.is_set():
+            show_task_error(error)
+
+    executor.submit(live_assets, sort_by, sort_order, *options, LIVE_RESULT_LIMIT, cancelled, on_done=finished, on_error=failed)
+
+def show_live_results(options, sort_by, sort_order, total, memory, generation):
+    global live_query, live_results
+    live_query = None
+    live_results = (options, memory, generation)
+    top, tree, status_label = live_results_view()
+    filters, value_range, date_range = options
+    if memory is not None:
+        count_rows, fetch_rows = memory.count, memory.fetch
+    else:
+        count_rows = lambda: count_assets(filters, value_range, date_range)
+        fetch_rows = lambda sort_by, sort_order, limit, offset, after: fetch_asset_page(sort_by, sort_order, filters, value_range, date_range, limit, offset, after)
+    tree.set_source(count_rows, fetch_rows, sort_by or tree.sort_by, sort_order if sort_by else tree.sort_order, total)
+    status_label.config(text=f"{total} assets" if total else "No assets found")
 
 def display_employees_command():
-    employees = display_employees()
-    show_employees(employees, title="Display Employee List")
+    show_employees("Display Employee List")
 
-def edit_asset_command(asset):
+def edit_asset_command(asset, on_saved=None):
     asset_id = asset[0]
 
     edit_window = Toplevel(root)
@@ -268,10 +259,10 @@ def edit_asset_command(asset):
     tk.Label(edit_window, text="Value:").grid(row=2, column=0, padx=5, pady=5)
     value_entry = tk.Entry(edit_window)
     value_entry.grid(row=2, column=1, padx=5, pady=5)
-    value_entry.insert(0, asset[3])
+    value_entry.insert(0, from_cents(asset[3]))
 
     tk.Label(edit_window, text="Responsible Person:").grid(row=3, column=0, padx=5, pady=5)
-    responsible_person_combobox = ttk.Combobox(edit_window, values=[emp[1] for emp in display_employees()])
+    responsible_person_combobox = employee_combobox(edit_window)
     responsible_person_combobox.grid(row=3, column=1, padx=5, pady=5)
     responsible_person_combobox.set(asset[4])
 
@@ -304,9 +295,10 @@ def edit_asset_command(asset):
     date_received_frame = tk.Frame(edit_window)
     date_received_frame.grid(row=9, column=1, padx=5, pady=5)
 
-    day_var = tk.StringVar(value=asset[10].split('-')[0])
-    month_var = tk.StringVar(value=asset[10].split('-')[1])
-    year_var = tk.StringVar(value=asset[10].split('-')[2])
+    received_year, received_month, received_day = asset[10].split('-')
+    day_var = tk.StringVar(value=received_day)
+    month_var = tk.StringVar(value=received_month)
+    year_var = tk.StringVar(value=received_year)
 
     tk.Entry(date_received_frame, textvariable=day_var, width=5, validate="key", validatecommand=(validate_day, "%P")).pack(side=tk.LEFT)
     tk.Label(date_received_frame, text="-").pack(side=tk.LEFT)
@@ -324,18 +316,31 @@ def edit_asset_command(asset):
         new_street = street_entry.get()
         new_building_number = building_number_entry.get()
         new_room = room_entry.get()
-        new_date_received = f"{day_var.get()}-{month_var.get()}-{year_var.get()}"
 
         if new_name and new_value and new_city and new_street and new_building_number and new_room and day_var.get() and month_var.get() and year_var.get():
-            update_asset(asset_id, new_name, new_description, new_value, new_responsible_person, new_purchase_place, new_city, new_street, new_building_number, new_room, new_date_received)
-            messagebox.showinfo("Success", "Asset updated successfully")
-            edit_window.destroy()
-            updated_assets = display_assets()
-            show_assets(updated_assets, title="Updated Asset List")
+            try:
+                new_date_received = to_iso_date(f"{day_var.get()}-{month_var.get()}-{year_var.get()}")
+            except ValueError:
+                messagebox.showerror("Error", "Date Received is not a valid date!")
+                return
+            try:
+                new_value = to_cents(new_value)
+            except ValueError:
+                messagebox.showerror("Error", "Value is not a valid amount!")
+                return
+
+            def saved(result):
+                messagebox.showinfo("Success", "Asset updated successfully")
+                edit_window.destroy()
+                if on_saved:
+                    on_saved()
+
+            executor.submit(update_asset, asset_id, new_name, new_description, new_value, new_responsible_person, new_purchase_place, new_city, new_street,
+                            new_building_number, new_room, new_date_received, write=True, on_done=saved, on_error=show_task_error)
 
     tk.Button(edit_window, text="Save Changes", command=save_changes).grid(row=10, column=0, columnspan=2, pady=10)
 
-def edit_employee_command(employee):
+def edit_employee_command(employee, on_saved=None):
     employee_id = employee[0]
 
     edit_window = Toplevel(root)
@@ -367,15 +372,16 @@ def edit_employee_command(employee):
     salary_entry = tk.Entry(edit_window)
     salary_entry.grid(row=4, column=1, padx=5, pady=5)
     if len(employee) > 6:
-        salary_entry.insert(0, employee[6])
+        salary_entry.insert(0, from_cents(employee[6]))
 
     tk.Label(edit_window, text="Hire Date (DD-MM-YYYY):").grid(row=5, column=0, padx=5, pady=5)
     hire_date_frame = tk.Frame(edit_window)
     hire_date_frame.grid(row=5, column=1, padx=5, pady=5)
 
-    emp_day_var = tk.StringVar(value=employee[3].split('-')[0])
-    emp_month_var = tk.StringVar(value=employee[3].split('-')[1])
-    emp_year_var = tk.StringVar(value=employee[3].split('-')[2])
+    hire_year, hire_month, hire_day = employee[3].split('-')
+    emp_day_var = tk.StringVar(value=hire_day)
+    emp_month_var = tk.StringVar(value=hire_month)
+    emp_year_var = tk.StringVar(value=hire_year)
 
     tk.Entry(hire_date_frame, textvariable=emp_day_var, width=5, validate="key", validatecommand=(validate_day, "%P")).pack(side=tk.LEFT)
     tk.Label(hire_date_frame, text="-").pack(side=tk.LEFT)
@@ -389,136 +395,169 @@ def edit_employee_command(employee):
         new_department = department_entry.get()
         new_supervisor = supervisor_entry.get()
         new_salary = salary_entry.get()
-        new_hire_date = f"{emp_day_var.get()}-{emp_month_var.get()}-{emp_year_var.get()}"
 
         if new_name and new_position and new_department and new_salary and emp_day_var.get() and emp_month_var.get() and emp_year_var.get():
-            update_employee(employee_id, new_name, new_position, new_hire_date, new_department, new_supervisor, new_salary)
-            messagebox.showinfo("Success", "Employee updated successfully")
-            edit_window.destroy()
-            updated_employees = display_employees()
-            show_employees(updated_employees, title="Updated Employee List")
+            try:
+                new_hire_date = to_iso_date(f"{emp_day_var.get()}-{emp_month_var.get()}-{emp_year_var.get()}")
+            except ValueError:
+                messagebox.showerror("Error", "Hire Date is not a valid date!")
+                return
+            try:
+                new_salary = to_cents(new_salary)
+            except ValueError:
+                messagebox.showerror("Error", "Salary is not a valid amount!")
+                return
+
+            def saved(result):
+                messagebox.showinfo("Success", "Employee updated successfully")
+                edit_window.destroy()
+                if on_saved:
+                    on_saved()
+
+            executor.submit(update_employee, employee_id, new_name, new_position, new_hire_date, new_department, new_supervisor, new_salary,
+                            write=True, on_done=saved, on_error=show_task_error)
 
     tk.Button(edit_window, text="Save Changes", command=save_changes).grid(row=6, column=0, columnspan=2, pady=10)
 
-def edit_asset_list():
-    sort_by = sort_by_combobox.get()
-    sort_order = sort_order_combobox.get()
-    filters = {
-        "name": name_filter_entry.get(),
-        "description": description_filter_entry.get(),
-        "value": value_filter_entry.get(),
-        "responsible_person": responsible_person_filter_entry.get(),
-        "purchase_place": purchase_place_filter_entry.get(),
-        "city": city_filter_entry.get(),
-        "street": street_filter_entry.get(),
-        "building_number": building_number_filter_entry.get(),
-        "room": room_filter_entry.get()
-    }
-    min_value = min_value_entry.get()
-    max_value = max_value_entry.get()
-    value_range = (min_value, max_value) if min_value and max_value else None
+def add_selection_buttons(tree, action, get_record, command, batch_command):
+    def run_selected():
+        selected_ids = sorted(tree.selected_ids)
+        if not selected_ids:
+            record_id = simpledialog.askinteger("Input", f"Enter the ID of the record you want to {action}:", parent=tree, minvalue=1)
+            if not record_id:
+                return
+            selected_ids = [record_id]
+        if len(selected_ids) > 1:
+            batch_command(tree, selected_ids)
+            return
+
+        def open_record(record):
+            if record:
+                command(record, lambda: refresh_selection(tree))
+            else:
+                messagebox.showerror("Error", f"No record with ID {selected_ids[0]}")
+
+        executor.submit(get_record, selected_ids[0], on_done=open_record, on_error=show_task_error)
+
+    tk.Button(tree.master, text=f"{action.capitalize()} Selected", command=run_selected).pack(pady=5)
+
+def batch_edit_dialog(title, prompt, fields, update, on_updated):
+    dialog = Toplevel(root)
+    dialog.title(title)
+    tk.Label(dialog, text=f"Fields left empty are not changed in {prompt}").grid(row=0, column=0, columnspan=2, padx=5, pady=5)
+    entries = {}
+    for row, (column, label) in enumerate(fields, start=1):
+        tk.Label(dialog, text=f"{label}:").grid(row=row, column=0, padx=5, pady=5)
+        entries[column] = employee_combobox(dialog) if column == "responsible_person" else tk.Entry(dialog)
+        entries[column].grid(row=row, column=1, padx=5, pady=5)
+
+    def finished(updated):
+        dialog.destroy()
+        messagebox.showinfo("Success", f"{updated} records updated")
+        on_updated()
+
+    def apply_changes():
+        changes = {column: entry.get() for column, entry in entries.items() if entry.get()}
+        if not changes:
+            messagebox.showerror("Error", "Fill in at least one field")
+            return
+        try:
+            for column in ("value", "salary"):
+                if column in changes:
+                    changes[column] = to_cents(changes[column])
+        except ValueError:
+            messagebox.showerror("Error", f"{column.capitalize()} is not a valid amount!")
+            return
+        executor.submit(update, changes, write=True, on_done=finished, on_error=show_task_error)
+
+    tk.Button(dialog, text="Apply", command=apply_changes).grid(row=len(fields) + 1, column=0, columnspan=2, pady=10)
+
+def batch_delete(prompt, delete, on_deleted):
+    if not messagebox.askyesno("Confirm", f"Are you sure you want to delete {prompt}?"):
+        return
 
-    start_day = start_day_var.get()
-    start_month = start_month_var.get()
-    start_year = start_year_var.get()
-    end_day = end_day_var.get()
-    end_month = end_month_var.get()
-    end_year = end_year_var.get()
+    def finished(deleted):
+        messagebox.showinfo("Success", f"{deleted} records deleted")
+        on_deleted()
 
-    start_date = f"{start_day}-{start_month}-{start_year}" if start_day and start_month and start_year else None
-    end_date = f"{end_day}-{end_month}-{end_year}" if end_day and end_month and end_year else None
+    executor.submit(delete, write=True, on_done=finished, on_error=show_task_error)
+
+def refresh_selection(tree):
+    tree.selected_ids.clear()
+    tree.refresh(keep_position=True)
+
+def batch_edit_assets(tree, asset_ids):
+    batch_edit_dialog("Edit Selected Assets", f"the {len(asset_ids)} selected assets", BATCH_ASSET_FIELDS,
+                      lambda changes: update_assets(asset_ids, changes), lambda: refresh_selection(tree))
+
+def batch_edit_employees(tree, employee_ids):
+    batch_edit_dialog("Edit Selected Employees", f"the {len(employee_ids)} selected employees", BATCH_EMPLOYEE_FIELDS,
+                      lambda changes: update_employees(employee_ids, changes), lambda: refresh_selection(tree))
+
+def batch_delete_assets(tree, asset_ids):
+    batch_delete(f"the {len(asset_ids)} selected assets", lambda: delete_assets(asset_ids), lambda: refresh_selection(tree))
 
-    date_range = (start_date, end_date) if start_date and end_date else None
+def batch_delete_employees(tree, employee_ids):
+    batch_delete(f"the {len(employee_ids)} selected employees", lambda: delete_employees(employee_ids), lambda: refresh_selection(tree))
 
-    assets = display_assets(sort_by, sort_order, filters, value_range, date_range)
-    show_assets(assets, title="Edit Asset List")
-    if assets:
-        asset_ids = [asset[0] for asset in assets]
-        asset_id = simpledialog.askinteger("Input", "Enter the ID of the asset you want to edit:", initialvalue=asset_ids[0], minvalue=min(asset_ids), maxvalue=max(asset_ids))
-        if asset_id:
-            asset_to_edit = [asset for asset in assets if asset[0] == asset_id]
-            if asset_to_edit:
-                edit_asset_command(asset_to_edit[0])
+def change_matching_assets(action):
+    sort_by, sort_order, filters, value_range, date_range = read_asset_filter_form()
+
+    def counted(total):
+        if not total:
+            messagebox.showinfo("Assets", "No assets found")
+        elif action == "update":
+            batch_edit_dialog("Update Matching Assets", f"all {total} assets matching the filters", BATCH_ASSET_FIELDS,
+                              lambda changes: update_assets_where(changes, filters, value_range, date_range), lambda: None)
+        else:
+            batch_delete(f"all {total} assets matching the filters", lambda: delete_assets_where(filters, value_range, date_range), lambda: None)
+
+    executor.submit(count_assets, filters, value_range, date_range, on_done=counted, on_error=show_task_error)
+
+def choose_assets(title, action, command, batch_command):
+    query_options = read_asset_filter_form()
+    sort_by, sort_order, filters, value_range, date_range = query_options
+
+    def show(total):
+        tree = show_assets(title, *query_options, total=total)
+        if tree:
+            add_selection_buttons(tree, action, get_asset_by_id, command, batch_command)
+
+    executor.submit(count_assets, filters, value_range, date_range, on_done=show, on_error=show_task_error)
+
+def choose_employees(title, action, command, batch_command):
+    tree = show_employees(title)
+    if tree:
+        add_selection_buttons(tree, action, get_employee_by_id, command, batch_command)
+
+def edit_asset_list():
+    choose_assets("Edit Asset List", "edit", edit_asset_command, batch_edit_assets)
 
 def edit_employee_list():
-    employees = display_employees()
-    show_employees(employees, title="Edit Employee List")
-    if employees:
-        employee_ids = [employee[0] for employee in employees]
-        employee_id = simpledialog.askinteger("Input", "Enter the ID of the employee you want to edit:", initialvalue=employee_ids[0], minvalue=min(employee_ids), maxvalue=max(employee_ids))
-        if employee_id:
-            employee_to_edit = [employee for employee in employees if employee[0] == employee_id]
-            if employee_to_edit:
-                edit_employee_command(employee_to_edit[0])
-
-def delete_asset_command(asset):
+    choose_employees("Edit Employee List", "edit", edit_employee_command, batch_edit_employees)
+
+def delete_asset_command(asset, on_deleted=None):
     asset_id = asset[0]
     confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete this asset?")
     if confirm:
-        delete_asset(asset_id)
-        messagebox.showinfo("Success", "Asset deleted successfully")
-        updated_assets = display_assets()
-        show_assets(updated_assets, title="Updated Asset List")
+        executor.submit(delete_asset, asset_id, write=True, on_done=lambda result: deleted("Asset deleted successfully", on_deleted), on_error=show_task_error)
 
-def delete_employee_command(employee):
+def delete_employee_command(employee, on_deleted=None):
     employee_id = employee[0]
     confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete this employee?")
     if confirm:
-        delete_employee(employee_id)
-        messagebox.showinfo("Success", "Employee deleted successfully")
-        updated_employees = display_employees()
-        show_employees(updated_employees, title="Updated Employee List")
-
-def delete_asset_list():
-    sort_by = sort_by_combobox.get()
-    sort_order = sort_order_combobox.get()
-    filters = {
-        "name": name_filter_entry.get(),
-        "description": description_filter_entry.get(),
-        "value": value_filter_entry.get(),
-        "responsible_person": responsible_person_filter_entry.get(),
-        "purchase_place": purchase_place_filter_entry.get(),
-        "city": city_filter_entry.get(),
-        "street": street_filter_entry.get(),
-        "building_number": building_number_filter_entry.get(),
-        "room": room_filter_entry.get()
-    }
-    min_value = min_value_entry.get()
-    max_value = max_value_entry.get()
-    value_range = (min_value, max_value) if min_value and max_value else None
-
-    start_day = start_day_var.get()
-    start_month = start_month_var.get()
-    start_year = start_year_var.get()
-    end_day = end_day_var.get()
-    end_month = end_month_var.get()
-    end_year = end_year_var.get()
-
-    start_date = f"{start_day}-{start_month}-{start_year}" if start_day and start_month and start_year else None
-    end_date = f"{end_day}-{end_month}-{end_year}" if end_day and end_month and end_year else None
+        executor.submit(delete_employee, employee_id, write=True, on_done=lambda result: deleted("Employee deleted successfully", on_deleted), on_error=show_task_error)
 
-    date_range = (start_date, end_date) if start_date and end_date else None
+def deleted(message, on_deleted):
+    messagebox.showinfo("Success", message)
+    if on_deleted:
+        on_deleted()
 
-    assets = display_assets(sort_by, sort_order, filters, value_range, date_range)
-    show_assets(assets, title="Delete Asset List")
-    if assets:
-        asset_ids = [asset[0] for asset in assets]
-        asset_id = simpledialog.askinteger("Input", "Enter the ID of the asset you want to delete:", initialvalue=asset_ids[0], minvalue=min(asset_ids), maxvalue=max(asset_ids))
-        if asset_id:
-            asset_to_delete = [asset for asset in assets if asset[0] == asset_id]
-            if asset_to_delete:
-                delete_asset_command(asset_to_delete[0])
+def delete_asset_list():
+    choose_assets("Delete Asset List", "delete", delete_asset_command, batch_delete_assets)
 
 def delete_employee_list():
-    employees = display_employees()
-    show_employees(employees, title="Delete Employee List")
-    if employees:
-        employee_ids = [employee[0] for employee in employees]
-        employee_id = simpledialog.askinteger("Input", "Enter the ID of the employee you want to delete:", initialvalue=employee_ids[0], minvalue=min(employee_ids), maxvalue=max(employee_ids))
-        if employee_id:
-            employee_to_delete = [employee for employee in employees if employee[0] == employee_id]
-            if employee_to_delete:
-                delete_employee_command(employee_to_delete[0])
+    choose_employees("Delete Employee List", "delete", delete_employee_command, batch_delete_employees)
 
 def validate_value(P):
     if P.isdigit() or P == "":
@@ -546,92 +585,187 @@ def validate_year(P):
         return True
     return False
 
+def show_import_result(result, message):
+    show_csv_result(result, f"{message}\n{result.imported} rows imported in {result.seconds:.1f}s")
+
+def show_sync_result(result):
+    show_csv_result(result, f"Assets synchronized in {result.seconds:.1f}s\n{result.inserted} inserted, {result.updated} updated, "
+                            f"{result.unchanged} unchanged, {result.deleted} deleted")
+
+def show_csv_result(result, message):
+    if result.rejected:
+        rejected = "\n".join(f"Line {line}: {reason}" for line, reason in result.errors[:10])
+        message += f"\n{result.rejected} rows rejected:\n{rejected}"
+        messagebox.showwarning("Import", message)
+    else:
+        messagebox.showinfo("Success", message)
+
+def show_task_error(error):
+    if isinstance(error, TaskCancelled):
+        messagebox.showinfo("Cancelled", "The operation was cancelled")
+    else:
+        messagebox.showerror("Error", str(error))
+
+def run_with_progress(title, function, *args, on_done=None, write=False, **kwargs):
+    dialog = Toplevel(root)
+    dialog.title(title)
+    dialog.transient(root)
+    status_label = tk.Label(dialog, text="Working...", width=40)
+    status_label.pack(padx=20, pady=10)
+    progress_bar = ttk.Progressbar(dialog, mode="indeterminate", length=250)
+    progress_bar.pack(padx=20, pady=5)
+    progress_bar.start()
+
+    def finished(result):
+        dialog.destroy()
+        if on_done:
+            on_done(result)
+
+    def failed(error):
+        dialog.destroy()
+        show_task_error(error)
+
+    def progress(rows, rows_per_second):
+        status_label.config(text=f"{rows} rows ({rows_per_second:.0f} rows/s)")
+
+    task = executor.submit(function, *args, write=write, on_done=finished, on_error=failed, on_progress=progress, with_progress=True, **kwargs)
+    cancel_button = tk.Button(dialog, text="Cancel", command=lambda: (task.cancel(), cancel_button.config(state=tk.DISABLED)))
+    cancel_button.pack(pady=10)
+    dialog.protocol("WM_DELETE_WINDOW", task.cancel)
+    return task
+
 def import_from_csv():
     file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
     if file_path:
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            if 'id' in reader.fieldnames:
-                messagebox.showerror("Error", "CSV file contains 'id' column. Please remove it and try again.")
-                return
-            for row in reader:
-                add_asset(
-                    row['name'], row['description'], row['value'],
-                    row['responsible_person'], row['purchase_place'],
-                    row['city'], row['street'], row['building_number'], row['room'], row['date_received']
-                )
-        messagebox.showinfo("Success", "Data imported successfully")
+        run_with_progress("Importing Assets", import_assets_csv, file_path, atomic=True, write=True,
+                          on_done=lambda result: show_import_result(result, "Data imported successfully"))
+
+def sync_from_csv():
+    file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+    if not file_path:
+        return
+    delete_missing = messagebox.askyesnocancel("Sync Assets", "Delete assets that are not in the file?")
+    if delete_missing is not None:
+        run_with_progress("Synchronizing Assets", sync_assets_csv, file_path, delete_missing=delete_missing, write=True,
+                          on_done=show_sync_result)
 
 def export_to_csv():
-    file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
+    file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv"), ("Compressed CSV Files", "*.csv.gz")])
     if file_path:
-        assets = display_assets()
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['id', 'name', 'description', 'value', 'responsible_person', 'purchase_place', 'city', 'street', 'building_number', 'room', 'date_received']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            writer.writeheader()
-            for asset in assets:
-                writer.writerow({
-                    'id': asset[0],
-                    'name': asset[1],
-                    'description': asset[2],
-                    'value': asset[3],
-                    'responsible_person': asset[4],
-                    'purchase_place': asset[5],
-                    'city': asset[6],
-                    'street': asset[7],
-                    'building_number': asset[8],
-                    'room': asset[9],
-                    'date_received': asset[10]
-                })
-        messagebox.showinfo("Success", "Data exported successfully")
+        run_with_progress("Exporting Assets", export_assets_csv, file_path, *read_asset_filter_form(),
+                          on_done=lambda exported: messagebox.showinfo("Success", f"Data exported successfully ({exported} assets)"))
 
 def import_employees_from_csv():
     file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
     if file_path:
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            if 'id' in reader.fieldnames:
-                messagebox.showerror("Error", "CSV file contains 'id' column. Please remove it and try again.")
-                return
-            for row in reader:
-                add_employee(
-                    row['name'], row['position'], row['hire_date'], row['department'], row['supervisor'], row['salary']
-                )
-        messagebox.showinfo("Success", "Employee data imported successfully")
+        run_with_progress("Importing Employees", import_employees_csv, file_path, atomic=True, write=True,
+                          on_done=lambda result: show_import_result(result, "Employee data imported successfully"))
 
 def export_employees_to_csv():
-    file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
+    file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv"), ("Compressed CSV Files", "*.csv.gz")])
     if file_path:
-        employees = display_employees()
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['id', 'name', 'position', 'hire_date', 'department', 'supervisor', 'salary']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            writer.writeheader()
-            for employee in employees:
-                writer.writerow({
-                    'id': employee[0],
-                    'name': employee[1],
-                    'position': employee[2],
-                    'hire_date': employee[3],
-                    'department': employee[4] if len(employee) > 4 else '',
-                    'supervisor': employee[5] if len(employee) > 5 else '',
-                    'salary': employee[6] if len(employee) > 6 else ''
-                })
-        messagebox.showinfo("Success", "Employee data exported successfully")
+        run_with_progress("Exporting Employees", export_employees_csv, file_path,
+                          on_done=lambda exported: messagebox.showinfo("Success", f"Employee data exported successfully ({exported} employees)"))
+
+def show_reports():
+    top = Toplevel(root)
+    top.title("Asset Reports")
+    controls = tk.Frame(top)
+    controls.pack(pady=5)
+    tk.Label(controls, text="Totals by:").pack(side=tk.LEFT, padx=5)
+    dimension_combobox = ttk.Combobox(controls, values=ROLLUP_DIMENSIONS, state="readonly")
+    dimension_combobox.set("city")
+    dimension_combobox.pack(side=tk.LEFT, padx=5)
+    tree = ttk.Treeview(top, columns=("group", "count", "total"), show='headings', height=20)
+    for column, heading, width in (("group", "Group", 400), ("count", "Assets", 100), ("total", "Total Value", 150)):
+        tree.heading(column, text=heading)
+        tree.column(column, width=width, anchor=tk.W if column == "group" else tk.E)
+    scrollbar = ttk.Scrollbar(top, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=scrollbar.set)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=1)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def show_report(report):
+        tree.delete(*tree.get_children())
+        for *group, count, total in report:
+            tree.insert("", "end", values=(" / ".join(str(value) for value in group), count, from_cents(total)))
+
+    def load_report(event=None):
+        executor.submit(rollup_report, dimension_combobox.get(), on_done=show_report, on_error=show_task_error)
+
+    dimension_combobox.bind("<<ComboboxSelected>>", load_report)
+    tk.Button(controls, text="Refresh", command=load_report).pack(side=tk.LEFT, padx=5)
+    tk.Button(controls, text="Rebuild Totals", command=lambda: executor.submit(rebuild_rollups, write=True, on_done=lambda result: load_report(), on_error=show_task_error)).pack(side=tk.LEFT, padx=5)
+    load_report()
+
+def show_diagnostics():
+    top = Toplevel(root)
+    top.title("Query Diagnostics")
+    columns = ("calls", "rows", "total_ms", "mean_ms", "p95_ms", "p99_ms", "max_ms", "statement")
+    tree = ttk.Treeview(top, columns=columns, show='headings', height=20)
+    for column, heading in zip(columns, ("Calls", "Rows", "Total ms", "Mean ms", "p95 ms", "p99 ms", "Max ms", "Statement")):
+        tree.heading(column, text=heading)
+        tree.column(column, width=600 if column == "statement" else 80, anchor=tk.W if column == "statement" else tk.E)
+    tree.pack(fill=tk.BOTH, expand=1)
+    waits_label = tk.Label(top, justify=tk.LEFT)
+    waits_label.pack(pady=5)
+    cache_label = tk.Label(top, justify=tk.LEFT)
+    cache_label.pack(pady=5)
+
+    def refresh():
+        if not top.winfo_exists():
+            return
+        snapshot = query_stats.snapshot()
+        tree.delete(*tree.get_children())
+        for statement in snapshot['statements']:
+            tree.insert("", "end", values=[statement['calls'], statement['rows']] + [f"{statement[column]:.2f}" for column in columns[2:-1]] + [statement['statement']])
+        waits = [f"{lane}: {wait['calls']} waits, p99 {wait['p99_ms']:.2f} ms, max {wait['max_ms']:.2f} ms" for lane, wait in sorted(snapshot['connection_waits'].items())]
+        waits_label.config(text="Connection wait - " + "; ".join(waits) if waits else "No connection waits recorded")
+        cache_label.config(text=format_cache_stats(asset_cache.stats()))
+        top.after(DIAGNOSTICS_REFRESH_INTERVAL, refresh)
+
+    buttons = tk.Frame(top)
+    buttons.pack(pady=5)
+    tk.Button(buttons, text="Reset", command=lambda: (query_stats.reset(), asset_cache.reset_stats())).pack(side=tk.LEFT, padx=5)
+    tk.Button(buttons, text="Close", command=top.destroy).pack(side=tk.LEFT, padx=5)
+    refresh()
+
+def employee_combobox(master):
+    combobox = ttk.Combobox(master)
+
+    def update_values(event=None):
+        if event is None or event.keysym not in ("Up", "Down", "Return", "Escape", "Tab"):
+            combobox.configure(values=employee_directory.names(combobox.get(), TYPE_AHEAD_LIMIT))
+
+    combobox.configure(postcommand=update_values)
+    combobox.bind("<KeyRelease>", update_values)
+    return combobox
 
 def show_frame(frame):
     frame.tkraise()
 
 # Database initialization
+ASSET_HEADINGS = ("ID", "Name", "Description", "Value", "Responsible Person", "Purchase Place", "City", "Street", "Building Number", "Room", "Date Received")
+LIVE_FILTER_DELAY = 300
+live_filter_job = None
+live_query = None
+live_results = None
+live_view = None
+DIAGNOSTICS_REFRESH_INTERVAL = 2000
+TYPE_AHEAD_LIMIT = 500
+BATCH_ASSET_FIELDS = (
+    ("description", "Description"), ("value", "Value"), ("responsible_person", "Responsible Person"), ("purchase_place", "Purchase Place"),
+    ("city", "City"), ("street", "Street"), ("building_number", "Building Number"), ("room", "Room"), ("category", "Depreciation Category"),
+)
+BATCH_EMPLOYEE_FIELDS = (("position", "Position"), ("department", "Department"), ("supervisor", "Supervisor"), ("salary", "Salary"))
+configure_slow_query_log("slow_queries.log")
 create_tables()
 
 # GUI creation
 root = tk.Tk()
 root.title("Management System")
 root.geometry("600x800")
+executor = TaskExecutor(root)
 
 # Define frames
 menu_frame = tk.Frame(root)
@@ -652,6 +786,7 @@ for frame in (menu_frame, asset_management_frame, employee_management_frame, add
 tk.Label(menu_frame, text="Management System", font=("Helvetica", 16)).pack(pady=20)
 tk.Button(menu_frame, text="Asset Management", command=lambda: show_frame(asset_management_frame)).pack(pady=10)
 tk.Button(menu_frame, text="Employee Management", command=lambda: show_frame(employee_management_frame)).pack(pady=10)
+tk.Button(menu_frame, text="Query Diagnostics", command=show_diagnostics).pack(pady=10)
 tk.Button(menu_frame, text="Close Program", command=root.quit).pack(pady=10)
 
 # Asset management frame
@@ -661,7 +796,9 @@ tk.Button(asset_management_frame, text="Edit Asset", command=lambda: show_frame(
 tk.Button(asset_management_frame, text="Delete Asset", command=lambda: show_frame(delete_asset_frame)).pack(pady=10)
 tk.Button(asset_management_frame, text="Display Assets", command=lambda: show_frame(display_asset_frame)).pack(pady=10)
 tk.Button(asset_management_frame, text="Import Assets from CSV", command=import_from_csv).pack(pady=10)
+tk.Button(asset_management_frame, text="Sync Assets from CSV", command=sync_from_csv).pack(pady=10)
 tk.Button(asset_management_frame, text="Export Assets to CSV", command=export_to_csv).pack(pady=10)
+tk.Button(asset_management_frame, text="Asset Reports", command=show_reports).pack(pady=10)
 tk.Button(asset_management_frame, text="Back to Menu", command=lambda: show_frame(menu_frame)).pack(pady=10)
 
 # Employee management frame
@@ -697,7 +834,7 @@ value_entry = tk.Entry(add_asset_form, validate="key", validatecommand=(validate
 value_entry.grid(row=2, column=1, padx=5, pady=5)
 
 tk.Label(add_asset_form, text="Responsible Person:").grid(row=3, column=0, padx=5, pady=5)
-responsible_person_combobox = ttk.Combobox(add_asset_form, values=[emp[1] for emp in display_employees()])
+responsible_person_combobox = employee_combobox(add_asset_form)
 responsible_person_combobox.grid(row=3, column=1, padx=5, pady=5)
 
 tk.Label(add_asset_form, text="Purchase Place:").grid(row=4, column=0, padx=5, pady=5)
@@ -879,14 +1016,24 @@ tk.Label(end_date_frame, text="-").pack(side=tk.LEFT)
 tk.Entry(end_date_frame, textvariable=end_year_var, width=10, validate="key", validatecommand=(validate_year_cmd, "%P")).pack(side=tk.LEFT)
 
 tk.Label(filter_frame, text="Sort By:").grid(row=12, column=0, padx=5, pady=5)
-sort_by_combobox = ttk.Combobox(filter_frame, values=["id", "name", "description", "value", "responsible_person", "purchase_place", "city", "street", "building_number", "room", "date_received"])
+sort_by_combobox = ttk.Combobox(filter_frame, values=ASSET_SORT_COLUMNS)
 sort_by_combobox.grid(row=12, column=1, padx=5, pady=5)
 
 tk.Label(filter_frame, text="Sort Order:").grid(row=13, column=0, padx=5, pady=5)
-sort_order_combobox = ttk.Combobox(filter_frame, values=["ASC", "DESC"])
+sort_order_combobox = ttk.Combobox(filter_frame, values=SORT_ORDERS)
 sort_order_combobox.grid(row=13, column=1, padx=5, pady=5)
 
 tk.Button(filter_frame, text="Display Assets", command=display_assets_command).grid(row=14, column=0, columnspan=2, pady=10)
+
+for entry in (name_filter_entry, description_filter_entry, value_filter_entry, min_value_entry, max_value_entry, responsible_person_filter_entry,
+              purchase_place_filter_entry, city_filter_entry, street_filter_entry, building_number_filter_entry, room_filter_entry):
+    entry.bind("<KeyRelease>", schedule_live_filter)
+for combobox in (sort_by_combobox, sort_order_combobox):
+    combobox.bind("<<ComboboxSelected>>", schedule_live_filter)
+for variable in (start_day_var, start_month_var, start_year_var, end_day_var, end_month_var, end_year_var):
+    variable.trace_add("write", schedule_live_filter)
+tk.Button(filter_frame, text="Update Matching Assets", command=lambda: change_matching_assets("update")).grid(row=15, column=0, pady=10)
+tk.Button(filter_frame, text="Delete Matching Assets", command=lambda: change_matching_assets("delete")).grid(row=15, column=1, pady=10)
 tk.Button(display_asset_frame, text="Back to Menu", command=lambda: show_frame(asset_management_frame)).pack(pady=10)
 
 # Start with menu frame
@@ -894,4 +1041,5 @@ show_frame(menu_frame)
 
 # Start the GUI event loop
 root.mainloop()
+executor.shutdown()
 
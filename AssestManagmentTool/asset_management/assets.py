@@ -0,0 +1,170 @@
+from . import queries
+from .database import reader, writer
+from .queries import ASSET_COLUMNS, ASSET_SORT_COLUMNS, build_asset_query, build_asset_page_query, match_expression
+from .result_cache import asset_cache, filter_key
+
+EMPLOYEE_ID_BY_NAME = "(SELECT MIN(id) FROM Employees WHERE name = ?4 COLLATE NOCASE)"
+
+ASSET_INSERT = f'''
+    INSERT INTO Assets (
+        name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received, employee_id
+    ) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, {EMPLOYEE_ID_BY_NAME})
+'''
+
+ASSET_UPDATE = f'''
+    UPDATE Assets SET
+        name = ?1, description = ?2, value = ?3, responsible_person = ?4, purchase_place = ?5, city = ?6, street = ?7, building_number = ?8, room = ?9, date_received = ?10,
+        employee_id = {EMPLOYEE_ID_BY_NAME}
+    WHERE id = ?11
+'''
+
+ASSET_EDITABLE_COLUMNS = ASSET_SORT_COLUMNS[1:] + ('category',)
+
+SUMMARY_COLUMNS = ('city', 'street', 'building_number', 'room', 'responsible_person', 'purchase_place')
+
+SEARCH_QUERY = f'''
+    SELECT {', '.join('AssetDetails.' + column for column in ASSET_SORT_COLUMNS)} FROM AssetsSearch
+    JOIN AssetDetails ON AssetDetails.id = AssetsSearch.rowid
+    WHERE AssetsSearch MATCH ?
+    ORDER BY bm25(AssetsSearch)
+    LIMIT ?
+'''
+
+def add_asset(name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received):
+    with writer() as connection:
+        patch = asset_cache.begin_patch(connection)
+        cursor = connection.execute(ASSET_INSERT, (name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received))
+        patch.finish(connection, cursor.lastrowid)
+    patch.apply()
+    return cursor.lastrowid
+
+def update_asset(asset_id, name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received):
+    with writer() as connection:
+        patch = asset_cache.begin_patch(connection, asset_id)
+        connection.execute(ASSET_UPDATE, (name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received, asset_id))
+        patch.finish(connection, asset_id)
+    patch.apply()
+
+def delete_asset(asset_id):
+    with writer() as connection:
+        patch = asset_cache.begin_patch(connection, asset_id)
+        connection.execute("DELETE FROM Assets WHERE id = ?", (asset_id,))
+        patch.finish(connection, None)
+    patch.apply()
+
+def asset_assignments(changes):
+    unknown = set(changes) - set(ASSET_EDITABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot change {', '.join(sorted(unknown))}")
+    if not changes:
+        raise ValueError("No changes given")
+    assignments = []
+    parameters = []
+    for column in ASSET_EDITABLE_COLUMNS:
+        if column in changes:
+            assignments.append(f"{column} = ?")
+            parameters.append(changes[column])
+            if column == 'responsible_person':
+                assignments.append("employee_id = (SELECT MIN(id) FROM Employees WHERE name = ? COLLATE NOCASE)")
+                parameters.append(changes[column])
+    return ', '.join(assignments), parameters
+
+def update_assets(asset_ids, changes):
+    assignments, parameters = asset_assignments(changes)
+    with writer() as connection:
+        cursor = connection.executemany(f"UPDATE Assets SET {assignments} WHERE id = ?", [parameters + [asset_id] for asset_id in asset_ids])
+        return cursor.rowcount
+
+def delete_assets(asset_ids):
+    with writer() as connection:
+        cursor = connection.executemany("DELETE FROM Assets WHERE id = ?", [(asset_id,) for asset_id in asset_ids])
+        return cursor.rowcount
+
+def matching_asset_ids(filters=None, value_range=None, date_range=None):
+    query, parameters = build_asset_query(filters=filters, value_range=value_range, date_range=date_range, columns='id')
+    if not parameters:
+        raise ValueError("At least one filter is required to change assets in bulk")
+    return query, parameters
+
+def update_assets_where(changes, filters=None, value_range=None, date_range=None):
+    assignments, parameters = asset_assignments(changes)
+    query, filter_parameters = matching_asset_ids(filters, value_range, date_range)
+    with writer() as connection:
+        cursor = connection.execute(f"UPDATE Assets SET {assignments} WHERE id IN ({query})", parameters + filter_parameters)
+        return cursor.rowcount
+
+def delete_assets_where(filters=None, value_range=None, date_range=None):
+    query, parameters = matching_asset_ids(filters, value_range, date_range)
+    with writer() as connection:
+        cursor = connection.execute(f"DELETE FROM Assets WHERE id IN ({query})", parameters)
+        return cursor.rowcount
+
+def get_asset_by_id(asset_id):
+    with reader() as connection:
+        return connection.execute(f"SELECT {ASSET_COLUMNS} FROM AssetDetails WHERE id = ?", (asset_id,)).fetchone()
+
+def iter_assets(filters=None, value_range=None, date_range=None, page_size=1000):
+    after = None
+    while True:
+        page = query_asset_page(None, 'ASC', filters, value_range, date_range, page_size, 0, after)
+        if not page:
+            return
+        yield from page
+        after = (None, page[-1][0])
+
+def display_assets(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, as_of=None):
+    if as_of:
+        return query_assets(sort_by, sort_order, filters, value_range, date_range, as_of)
+    key = ('rows', filter_key(filters, value_range, date_range), sort_by, sort_order, ())
+    return asset_cache.cached(key, lambda: query_assets(sort_by, sort_order, filters, value_range, date_range))
+
+def query_assets(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, as_of=None):
+    with reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute(*build_asset_query(sort_by, sort_order, filters, value_range, date_range, as_of=as_of))
+        assets = cursor.fetchall()
+    return assets
+
+def search_assets(text, limit=100):
+    if not queries.full_text_search:
+        return display_assets(filters={"name": text})[:limit]
+    expression = match_expression(text)
+    if not expression:
+        return []
+    with reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute(SEARCH_QUERY, (expression, limit))
+        assets = cursor.fetchall()
+    return assets
+
+def count_assets(filters=None, value_range=None, date_range=None):
+    key = ('count', filter_key(filters, value_range, date_range), None, None, ())
+    return asset_cache.cached(key, lambda: query_asset_count(filters, value_range, date_range))
+
+def query_asset_count(filters=None, value_range=None, date_range=None):
+    query, parameters = build_asset_query(filters=filters, value_range=value_range, date_range=date_range, columns='COUNT(*)')
+    with reader() as connection:
+        return connection.execute(query, parameters).fetchone()[0]
+
+def fetch_asset_page(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, limit=100, offset=0, after=None):
+    key = ('page', filter_key(filters, value_range, date_range), sort_by, sort_order, (limit, offset, after))
+    return asset_cache.cached(key, lambda: query_asset_page(sort_by, sort_order, filters, value_range, date_range, limit, offset, after))
+
+def query_asset_page(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, limit=100, offset=0, after=None):
+    with reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute(*build_asset_page_query(sort_by, sort_order, filters, value_range, date_range, limit, offset, after))
+        assets = cursor.fetchall()
+    return assets
+
+def summarize_assets(group_by='city'):
+    if group_by not in SUMMARY_COLUMNS:
+        raise ValueError(f"Cannot summarize by {group_by!r}")
+    with reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT {group_by}, COUNT(*), SUM(value) FROM AssetDetails GROUP BY {group_by} ORDER BY {group_by}")
+        summary = cursor.fetchall()
+    return summary
+
+def display_employee_assets(employee_id, sort_by=None, sort_order='ASC'):
+    return display_assets(sort_by, sort_order, {'employee_id': employee_id})
@@ -0,0 +1,292 @@
+import argparse
+import json
+import sys
+from . import database
+from .assets import ASSET_EDITABLE_COLUMNS, SUMMARY_COLUMNS, delete_assets, delete_assets_where, search_assets, summarize_assets, update_assets, update_assets_where
+from .csv_io import DEFAULT_BATCH_SIZE, SYNC_KEY, export_assets_csv, export_employees_csv, import_assets_csv, import_employees_csv, sync_assets_csv, write_rejects
+from .dates import to_iso_date
+from .depreciation import ENGINES, METHODS, depreciation_report, list_policies, run_depreciation, set_policy
+from .employees import count_employees
+from .history import asset_history
+from .instrumentation import SLOW_QUERY_THRESHOLD, configure_slow_query_log, format_stats, query_stats
+from .money import from_cents, to_cents
+from .parallel_import import CHUNK_BYTES, parallel_import_assets_csv, parallel_import_employees_csv
+from .queries import ASSET_SORT_COLUMNS, FILTER_COLUMNS, SORT_ORDERS, find_full_scans
+from .reporting import ROLLUP_DIMENSIONS, rebuild_rollups, rollup_report
+from .result_cache import asset_cache
+from .schema import create_tables
+from .server import DEFAULT_HOST, DEFAULT_PORT, MAX_GROUP_SIZE, run_server
+
+AS_OF_HELP = "show the inventory as it was at this time: a date (end of that day) or YYYY-MM-DD HH:MM[:SS]"
+
+def add_filter_arguments(parser):
+    for column in FILTER_COLUMNS:
+        parser.add_argument(f"--{column.replace('_', '-')}", dest=column, help=f"filter on {column}")
+    parser.add_argument('--min-value')
+    parser.add_argument('--max-value')
+    parser.add_argument('--date-from', help="DD-MM-YYYY or YYYY-MM-DD")
+    parser.add_argument('--date-to', help="DD-MM-YYYY or YYYY-MM-DD")
+    parser.add_argument('--sort-by', choices=ASSET_SORT_COLUMNS)
+    parser.add_argument('--sort-order', choices=SORT_ORDERS, default='ASC')
+
+def query_options(args):
+    filters = {column: getattr(args, column) for column in FILTER_COLUMNS if getattr(args, column)}
+    if 'value' in filters:
+        filters['value'] = to_cents(filters['value'])
+    value_range = (to_cents(args.min_value), to_cents(args.max_value)) if args.min_value and args.max_value else None
+    date_range = (to_iso_date(args.date_from), to_iso_date(args.date_to)) if args.date_from and args.date_to else None
+    return args.sort_by, args.sort_order, filters, value_range, date_range
+
+def print_progress(rows, rows_per_second):
+    print(f"\r{rows} rows ({rows_per_second:.0f} rows/s)", end='', file=sys.stderr, flush=True)
+
+def import_command(args):
+    progress = None if args.quiet else print_progress
+    if args.workers:
+        importer = parallel_import_assets_csv if args.command == 'import-assets' else parallel_import_employees_csv
+        result = importer(args.file, args.workers, args.chunk_mb * 1024 * 1024, args.rejects, progress)
+    else:
+        importer = import_assets_csv if args.command == 'import-assets' else import_employees_csv
+        result = importer(args.file, args.batch_size, progress)
+        if args.rejects:
+            write_rejects(args.rejects, result.errors)
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"{result.imported} rows imported in {result.seconds:.2f}s, {result.rejected} rejected")
+    for line, reason in result.errors:
+        print(f"line {line}: {reason}", file=sys.stderr)
+    return 1 if result.rejected else 0
+
+def sync_command(args):
+    key = [column.strip() for column in args.key.split(',')]
+    result = sync_assets_csv(args.file, key, args.delete_missing, args.batch_size, None if args.quiet else print_progress)
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(
+        f"{result.inserted} inserted, {result.updated} updated, {result.unchanged} unchanged, "
+        f"{result.deleted} deleted in {result.seconds:.2f}s, {result.rejected} rejected"
+    )
+    for line, reason in result.errors:
+        print(f"line {line}: {reason}", file=sys.stderr)
+    return 1 if result.rejected else 0
+
+def export_command(args):
+    progress = None if args.quiet or args.file == '-' else print_progress
+    if args.command == 'export-employees':
+        exported = export_employees_csv(args.file, args.gzip or None, progress=progress)
+    else:
+        exported = export_assets_csv(args.file, *query_options(args), compress=args.gzip or None, progress=progress, as_of=args.as_of)
+    if args.file != '-':
+        if progress:
+            print(file=sys.stderr)
+        print(f"{exported} rows exported to {args.file}")
+    return 0
+
+def query_command(args):
+    export_assets_csv('-', *query_options(args), as_of=args.as_of)
+    return 0
+
+def history_command(args):
+    for valid_from, valid_to, operation, values in asset_history(args.id):
+        changes = ', '.join(f"{column}={from_cents(value) if column == 'value' and value is not None else value}" for column, value in values.items())
+        print(f"{valid_from or '-'}\t{valid_to}\t{operation}\t{changes}")
+    return 0
+
+def search_command(args):
+    for asset in search_assets(args.text, args.limit):
+        print('\t'.join(str(field) for field in asset[:3] + (from_cents(asset[3]),) + asset[4:]))
+    return 0
+
+def report_command(args):
+    report = rollup_report(args.by) if args.by in ROLLUP_DIMENSIONS else summarize_assets(args.by)
+    for *group, count, total in report:
+        print('\t'.join(str(value) for value in group) + f"\t{count}\t{from_cents(total)}")
+    if args.employees:
+        print(f"employees\t{count_employees()}")
+    return 0
+
+def rebuild_reports_command(args):
+    rebuild_rollups()
+    print("Report totals rebuilt")
+    return 0
+
+def depreciation_command(args):
+    result = run_depreciation(args.as_of, args.engine)
+    for category, count, cost, accumulated, book in depreciation_report(result.as_of):
+        print(f"{category}\t{count}\t{from_cents(cost)}\t{from_cents(accumulated)}\t{from_cents(book)}")
+    print(f"{result.assets} assets depreciated as of {result.as_of} with the {result.engine} engine in {result.seconds:.2f}s")
+    return 0
+
+def depreciation_policy_command(args):
+    if args.category:
+        set_policy(args.category, args.method, args.life_months, args.annual_rate, args.salvage_percent)
+    for policy in list_policies():
+        print('\t'.join(str(value) for value in policy))
+    return 0
+
+def parse_changes(assignments):
+    changes = {}
+    for assignment in assignments:
+        column, separator, value = assignment.partition('=')
+        if not separator or column not in ASSET_EDITABLE_COLUMNS:
+            raise ValueError(f"Expected COLUMN=VALUE with one of {', '.join(ASSET_EDITABLE_COLUMNS)}, got {assignment!r}")
+        if column == 'date_received':
+            value = to_iso_date(value)
+        elif column == 'value':
+            value = to_cents(value)
+        changes[column] = value
+    return changes
+
+def bulk_change_command(args):
+    sort_by, sort_order, filters, value_range, date_range = query_options(args)
+    if args.ids and (filters or value_range or date_range):
+        raise ValueError("Use either --id or filters, not both")
+    if args.command == 'update-assets':
+        changes = parse_changes(args.changes)
+        if args.ids:
+            changed = update_assets(args.ids, changes)
+        else:
+            changed = update_assets_where(changes, filters, value_range, date_range)
+        print(f"{changed} assets updated")
+    else:
+        if args.ids:
+            changed = delete_assets(args.ids)
+        else:
+            changed = delete_assets_where(filters, value_range, date_range)
+        print(f"{changed} assets deleted")
+    return 0
+
+def serve_command(args):
+    run_server(args.host, args.port, args.readers, args.group_size, ready=lambda address: print(f"Serving on http://{address[0]}:{address[1]}", file=sys.stderr))
+    return 0
+
+def check_plans_command(args):
+    with database.reader() as connection:
+        problems = find_full_scans(connection)
+    for options, plan in problems:
+        print(f"{options}: {'; '.join(plan)}")
+    if not problems:
+        print("All checked asset queries use an index")
+    return 1 if problems else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='asset_management', description="Headless asset and employee management.")
+    parser.add_argument('--database', default=database.DATABASE_PATH, help="SQLite database file (default: %(default)s)")
+    parser.add_argument('--slow-log', help="append statements slower than --slow-ms to this file, with their query plan")
+    parser.add_argument('--slow-ms', type=float, default=SLOW_QUERY_THRESHOLD * 1000, help="slow query threshold in milliseconds (default: %(default)s)")
+    parser.add_argument('--stats', action='store_true', help="print per-statement timings to stderr when the command finishes")
+    parser.add_argument('--stats-json', help="write per-statement timings and histograms to this JSON file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('import-assets', 'import-employees'):
+        command = commands.add_parser(name, help=f"bulk {name.replace('-', ' ')} from a CSV file")
+        command.add_argument('file')
+        command.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        command.add_argument('--workers', type=int, help="parse and validate byte-range chunks in this many processes")
+        command.add_argument('--chunk-mb', type=int, default=CHUNK_BYTES // (1024 * 1024), help="chunk size for --workers (default: %(default)s)")
+        command.add_argument('--rejects', help="write line numbers and reasons of rejected rows to this CSV file")
+        command.add_argument('--quiet', action='store_true')
+        command.set_defaults(handler=import_command)
+
+    command = commands.add_parser('sync-assets', help="insert new and update changed assets from a CSV file, matching rows on a key")
+    command.add_argument('file')
+    command.add_argument('--key', default=','.join(SYNC_KEY), help="comma-separated columns identifying an asset, or external_id (default: %(default)s)")
+    command.add_argument('--delete-missing', action='store_true', help="delete assets that are not in the file")
+    command.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    command.add_argument('--quiet', action='store_true')
+    command.set_defaults(handler=sync_command)
+
+    command = commands.add_parser('export-assets', help="export assets to CSV ('-' for stdout)")
+    command.add_argument('file')
+    command.add_argument('--gzip', action='store_true')
+    command.add_argument('--quiet', action='store_true')
+    command.add_argument('--as-of', help=AS_OF_HELP)
+    add_filter_arguments(command)
+    command.set_defaults(handler=export_command)
+
+    command = commands.add_parser('export-employees', help="export employees to CSV ('-' for stdout)")
+    command.add_argument('file')
+    command.add_argument('--gzip', action='store_true')
+    command.add_argument('--quiet', action='store_true')
+    command.set_defaults(handler=export_command)
+
+    command = commands.add_parser('query', help="print matching assets as CSV")
+    command.add_argument('--as-of', help=AS_OF_HELP)
+    add_filter_arguments(command)
+    command.set_defaults(handler=query_command)
+
+    command = commands.add_parser('history', help="list the recorded changes of one asset, oldest first")
+    command.add_argument('id', type=int)
+    command.set_defaults(handler=history_command)
+
+    command = commands.add_parser('update-assets', help="change every asset matching the filters or ids in one transaction")
+    command.add_argument('--set', dest='changes', action='append', required=True, metavar='COLUMN=VALUE')
+    command.add_argument('--id', dest='ids', type=int, action='append', help="asset id (repeatable) instead of filters")
+    add_filter_arguments(command)
+    command.set_defaults(handler=bulk_change_command)
+
+    command = commands.add_parser('delete-assets', help="delete every asset matching the filters or ids in one transaction")
+    command.add_argument('--id', dest='ids', type=int, action='append', help="asset id (repeatable) instead of filters")
+    add_filter_arguments(command)
+    command.set_defaults(handler=bulk_change_command)
+
+    command = commands.add_parser('search', help="full-text search over asset name and description")
+    command.add_argument('text')
+    command.add_argument('--limit', type=int, default=100)
+    command.set_defaults(handler=search_command)
+
+    command = commands.add_parser('report', help="asset count and value per group")
+    command.add_argument('--by', choices=SUMMARY_COLUMNS + ('month',), default='city')
+    command.add_argument('--employees', action='store_true', help="also print the number of employees as a last 'employees' row")
+    command.set_defaults(handler=report_command)
+
+    command = commands.add_parser('rebuild-reports', help="recompute the report totals from the Assets table")
+    command.set_defaults(handler=rebuild_reports_command)
+
+    command = commands.add_parser('depreciation', help="write a book value snapshot of every asset and print totals per category")
+    command.add_argument('--as-of', help="DD-MM-YYYY or YYYY-MM-DD (default: end of the previous month)")
+    command.add_argument('--engine', choices=ENGINES, default='auto')
+    command.set_defaults(handler=depreciation_command)
+
+    command = commands.add_parser('depreciation-policy', help="list depreciation policies, or add or change one")
+    command.add_argument('category', nargs='?', help="asset category; assets without a known category use 'default'")
+    command.add_argument('--method', choices=METHODS, default='straight_line')
+    command.add_argument('--life-months', type=int, default=60)
+    command.add_argument('--annual-rate', type=float, default=0.0, help="declining-balance rate per year, e.g. 0.4")
+    command.add_argument('--salvage-percent', type=float, default=0.0)
+    command.set_defaults(handler=depreciation_policy_command)
+
+    command = commands.add_parser('serve', help="serve the asset and employee operations as an HTTP/JSON API")
+    command.add_argument('--host', default=DEFAULT_HOST)
+    command.add_argument('--port', type=int, default=DEFAULT_PORT)
+    command.add_argument('--readers', type=int, default=database.READER_POOL_SIZE, help="concurrent read queries (default: %(default)s)")
+    command.add_argument('--group-size', type=int, default=MAX_GROUP_SIZE, help="most writes committed in one transaction (default: %(default)s)")
+    command.set_defaults(handler=serve_command)
+
+    command = commands.add_parser('check-plans', help="report asset queries that fall back to full scans")
+    command.set_defaults(handler=check_plans_command)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    database.set_database_path(args.database)
+    configure_slow_query_log(args.slow_log, args.slow_ms / 1000)
+    create_tables()
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        dump_stats(args)
+
+def dump_stats(args):
+    if not (args.stats or args.stats_json):
+        return
+    snapshot = query_stats.snapshot()
+    snapshot['result_cache'] = asset_cache.stats()
+    if args.stats:
+        print(format_stats(snapshot), file=sys.stderr)
+    if args.stats_json:
+        with open(args.stats_json, 'w', encoding='utf-8') as output:
+            json.dump(snapshot, output, indent=2)
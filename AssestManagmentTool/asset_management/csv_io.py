@@ -0,0 +1,291 @@
+import csv
+import gzip
+import hashlib
+import os
+import sys
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from itertools import islice
+from .assets import ASSET_INSERT
+from .database import reader, writer
+from .dates import to_iso_date, iso_to_display_sql
+from .directory import employee_directory
+from .employees import EMPLOYEE_INSERT
+from .money import cents_to_display_sql, to_cents
+from .queries import build_asset_query
+
+DEFAULT_BATCH_SIZE = 5000
+EXPORT_CHUNK_SIZE = 2000
+
+ASSET_FIELDS = ('name', 'description', 'value', 'responsible_person', 'purchase_place', 'city', 'street', 'building_number', 'room', 'date_received')
+ASSET_REQUIRED = ('name', 'value', 'city', 'street', 'building_number', 'room', 'date_received')
+
+ASSET_EXPORT_FIELDS = ('id',) + ASSET_FIELDS
+
+EMPLOYEE_FIELDS = ('name', 'position', 'hire_date', 'department', 'supervisor', 'salary')
+EMPLOYEE_REQUIRED = ('name', 'position', 'hire_date', 'department', 'salary')
+EMPLOYEE_EXPORT_FIELDS = ('id',) + EMPLOYEE_FIELDS
+
+SYNC_FIELDS = ASSET_FIELDS + ('external_id',)
+SYNC_KEY = ('name', 'building_number', 'room')
+
+ImportResult = namedtuple('ImportResult', 'imported rejected errors seconds')
+SyncResult = namedtuple('SyncResult', 'inserted updated unchanged deleted rejected errors seconds')
+
+SYNC_STAGING_TABLE = f'''
+    CREATE TEMP TABLE SyncStaging (
+        line INTEGER PRIMARY KEY,
+        {', '.join(SYNC_FIELDS)},
+        sync_hash TEXT NOT NULL,
+        asset_id INTEGER
+    )
+'''
+
+SYNC_STAGING_INSERT = f"INSERT INTO SyncStaging (line, {', '.join(SYNC_FIELDS)}, sync_hash) VALUES ({', '.join('?' * (len(SYNC_FIELDS) + 2))})"
+
+SYNC_EMPLOYEE_ID = "(SELECT MIN(id) FROM Employees WHERE Employees.name = {staging}.responsible_person COLLATE NOCASE)"
+
+SYNC_UPDATE = f'''
+    UPDATE Assets SET
+        {', '.join(f'{field} = SyncStaging.{field}' for field in ASSET_FIELDS)},
+        employee_id = {SYNC_EMPLOYEE_ID.format(staging='SyncStaging')},
+        external_id = COALESCE(NULLIF(SyncStaging.external_id, ''), Assets.external_id),
+        sync_hash = SyncStaging.sync_hash
+    FROM SyncStaging
+    WHERE Assets.id = SyncStaging.asset_id AND Assets.sync_hash IS NOT SyncStaging.sync_hash
+'''
+
+SYNC_INSERT = f'''
+    INSERT INTO Assets ({', '.join(ASSET_FIELDS)}, employee_id, external_id, sync_hash)
+    SELECT {', '.join(ASSET_FIELDS)}, {SYNC_EMPLOYEE_ID.format(staging='SyncStaging')}, NULLIF(external_id, ''), sync_hash
+    FROM SyncStaging WHERE asset_id IS NULL ORDER BY line
+'''
+
+COERCIONS = {
+    'value': to_cents,
+    'salary': to_cents,
+    'date_received': to_iso_date,
+    'hire_date': to_iso_date,
+}
+
+def coerce_row(row, fields, required):
+    values = []
+    for field in fields:
+        text = (row.get(field) or '').strip()
+        if not text:
+            if field in required:
+                raise ValueError(f"missing {field}")
+            values.append('')
+            continue
+        coerce = COERCIONS.get(field)
+        if coerce:
+            try:
+                text = coerce(text)
+            except ValueError:
+                raise ValueError(f"invalid {field} {text!r}")
+        values.append(text)
+    return tuple(values)
+
+def check_header(fieldnames, fields, required):
+    if fieldnames is None:
+        raise ValueError("CSV file is empty.")
+    if 'id' in fieldnames:
+        raise ValueError("CSV file contains 'id' column. Please remove it and try again.")
+    missing = [field for field in required if field not in fieldnames]
+    if missing:
+        raise ValueError(f"CSV file is missing columns: {', '.join(missing)}")
+
+def parsed_batches(reader, fields, required, batch_size, errors, rejected=None):
+    numbered_rows = ((reader.line_num, row) for row in reader)
+    while True:
+        chunk = list(islice(numbered_rows, batch_size))
+        if not chunk:
+            return
+        batch = []
+        for line_number, row in chunk:
+            try:
+                batch.append((line_number, coerce_row(row, fields, required)))
+            except ValueError as error:
+                errors.append((line_number, str(error)))
+                if rejected is not None:
+                    rejected.append((line_number, row))
+        yield batch
+
+# With atomic the batches join one outer transaction, so an import that fails or is cancelled part way
+# leaves nothing behind; otherwise each batch commits on its own.
+def bulk_import(file_path, fields, required, insert_sql, batch_size=DEFAULT_BATCH_SIZE, progress=None, atomic=False):
+    started = time.perf_counter()
+    imported = 0
+    errors = []
+    with open(file_path, newline='', encoding='utf-8') as csvfile, writer() if atomic else nullcontext():
+        reader = csv.DictReader(csvfile)
+        check_header(reader.fieldnames, fields, required)
+        for batch in parsed_batches(reader, fields, required, batch_size, errors):
+            with writer() as connection:
+                connection.executemany(insert_sql, [values for _, values in batch])
+            imported += len(batch)
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress(imported, imported / elapsed if elapsed else 0.0)
+    return ImportResult(imported, len(errors), errors, time.perf_counter() - started)
+
+def import_assets_csv(file_path, batch_size=DEFAULT_BATCH_SIZE, progress=None, atomic=False):
+    return bulk_import(file_path, ASSET_FIELDS, ASSET_REQUIRED, ASSET_INSERT, batch_size, progress, atomic)
+
+def import_employees_csv(file_path, batch_size=DEFAULT_BATCH_SIZE, progress=None, atomic=False):
+    try:
+        return bulk_import(file_path, EMPLOYEE_FIELDS, EMPLOYEE_REQUIRED, EMPLOYEE_INSERT, batch_size, progress, atomic)
+    finally:
+        employee_directory.load_new()
+
+def write_rejects(file_path, errors):
+    with open(file_path, 'w', newline='', encoding='utf-8') as rejects:
+        output = csv.writer(rejects)
+        output.writerow(('line', 'reason'))
+        output.writerows(errors)
+
+def row_hash(values):
+    return hashlib.blake2b('\x1f'.join(map(str, values)).encode('utf-8'), digest_size=16).hexdigest()
+
+def rejected_key(row, key):
+    values = []
+    for column in key:
+        text = (row.get(column) or '').strip()
+        if not text:
+            return None
+        coerce = COERCIONS.get(column)
+        if coerce:
+            try:
+                text = coerce(text)
+            except ValueError:
+                return None
+        values.append(text)
+    return tuple(values)
+
+# A rejected feed row still names an asset that is meant to exist, so its key keeps that asset from being
+# deleted. When the key itself cannot be read there is no telling which asset the row meant.
+def stage_rejected_keys(connection, key, rejected):
+    keys = []
+    for line, row in rejected:
+        values = rejected_key(row, key)
+        if values is None:
+            raise ValueError(f"Line {line} was rejected and has no readable key; not deleting missing assets")
+        keys.append(values)
+    connection.execute(f"CREATE TEMP TABLE SyncRejected ({', '.join(key)})")
+    connection.executemany(f"INSERT INTO SyncRejected VALUES ({', '.join('?' * len(key))})", keys)
+
+def apply_sync(connection, key, delete_missing, errors, rejected=()):
+    key_columns = ', '.join(key)
+    connection.execute(f"CREATE INDEX temp.idx_sync_staging_key ON SyncStaging ({key_columns})")
+    duplicates = connection.execute(
+        f"DELETE FROM SyncStaging WHERE line NOT IN (SELECT MIN(line) FROM SyncStaging GROUP BY {key_columns}) RETURNING line"
+    ).fetchall()
+    errors.extend((line, f"duplicate key ({key_columns})") for line, in duplicates)
+    connection.execute(f'''
+        UPDATE SyncStaging SET asset_id = matches.asset_id
+        FROM (
+            SELECT SyncStaging.line AS line, MIN(Assets.id) AS asset_id
+            FROM Assets JOIN SyncStaging ON {' AND '.join(f'Assets.{column} = SyncStaging.{column}' for column in key)}
+            GROUP BY SyncStaging.line
+        ) AS matches
+        WHERE SyncStaging.line = matches.line
+    ''')
+    matched = connection.execute("SELECT COUNT(asset_id) FROM SyncStaging").fetchone()[0]
+    deleted = 0
+    if delete_missing:
+        scope = " AND external_id IS NOT NULL" if key == ('external_id',) else ""
+        if rejected:
+            stage_rejected_keys(connection, key, rejected)
+            scope += f" AND ({key_columns}) NOT IN (SELECT {key_columns} FROM SyncRejected)"
+        deleted = connection.execute(
+            f"DELETE FROM Assets WHERE id NOT IN (SELECT asset_id FROM SyncStaging WHERE asset_id IS NOT NULL){scope}"
+        ).rowcount
+    updated = connection.execute(SYNC_UPDATE).rowcount
+    inserted = connection.execute(SYNC_INSERT).rowcount
+    return inserted, updated, matched - updated, deleted
+
+def sync_assets_csv(file_path, key=SYNC_KEY, delete_missing=False, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    key = tuple(key)
+    unknown = set(key) - set(SYNC_FIELDS)
+    if not key or unknown:
+        raise ValueError(f"Cannot match assets on {', '.join(sorted(unknown)) or 'an empty key'}")
+    required = ASSET_REQUIRED + tuple(column for column in key if column not in ASSET_REQUIRED)
+    started = time.perf_counter()
+    staged = 0
+    errors = []
+    rejected = [] if delete_missing else None
+    with open(file_path, newline='', encoding='utf-8') as csvfile, writer() as connection:
+        reader = csv.DictReader(csvfile)
+        check_header(reader.fieldnames, SYNC_FIELDS, required)
+        connection.execute("DROP TABLE IF EXISTS temp.SyncStaging")
+        connection.execute(SYNC_STAGING_TABLE)
+        try:
+            for batch in parsed_batches(reader, SYNC_FIELDS, required, batch_size, errors, rejected):
+                connection.executemany(SYNC_STAGING_INSERT, [(line, *values, row_hash(values)) for line, values in batch])
+                staged += len(batch)
+                if progress:
+                    elapsed = time.perf_counter() - started
+                    progress(staged, staged / elapsed if elapsed else 0.0)
+            inserted, updated, unchanged, deleted = apply_sync(connection, key, delete_missing, errors, rejected)
+        finally:
+            connection.execute("DROP TABLE temp.SyncStaging")
+            connection.execute("DROP TABLE IF EXISTS temp.SyncRejected")
+    errors.sort()
+    return SyncResult(inserted, updated, unchanged, deleted, len(errors), errors, time.perf_counter() - started)
+
+def open_export_file(file_path, compress=None):
+    if compress is None:
+        compress = file_path.endswith('.gz')
+    if compress:
+        return gzip.open(file_path, 'wt', newline='', encoding='utf-8')
+    return open(file_path, 'w', newline='', encoding='utf-8')
+
+# The display expressions get their own aliases: named after the column, they would shadow it in ORDER BY
+# and sort by the formatted text. The CSV header is written from the field names.
+def export_column(field):
+    if field in ('date_received', 'hire_date'):
+        return f"{iso_to_display_sql(field)} AS display_{field}"
+    if field in ('value', 'salary'):
+        return f"{cents_to_display_sql(field)} AS display_{field}"
+    return field
+
+def export_columns(fields):
+    return ', '.join(export_column(field) for field in fields)
+
+def write_export(csvfile, query, parameters, fieldnames, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    started = time.perf_counter()
+    exported = 0
+    csv_writer = csv.writer(csvfile)
+    csv_writer.writerow(fieldnames)
+    with reader() as connection:
+        cursor = connection.execute(query, parameters)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            csv_writer.writerows(rows)
+            exported += len(rows)
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress(exported, exported / elapsed if elapsed else 0.0)
+    return exported
+
+def stream_export(file_path, query, parameters, fieldnames, compress=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    if file_path == '-':
+        return write_export(sys.stdout, query, parameters, fieldnames, chunk_size, progress)
+    try:
+        with open_export_file(file_path, compress) as csvfile:
+            return write_export(csvfile, query, parameters, fieldnames, chunk_size, progress)
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+def export_assets_csv(file_path, sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, compress=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None, as_of=None):
+    query, parameters = build_asset_query(sort_by, sort_order, filters, value_range, date_range, columns=export_columns(ASSET_EXPORT_FIELDS), as_of=as_of)
+    return stream_export(file_path, query, parameters, ASSET_EXPORT_FIELDS, compress, chunk_size, progress)
+
+def export_employees_csv(file_path, compress=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    query = f"SELECT {export_columns(EMPLOYEE_EXPORT_FIELDS)} FROM Employees"
+    return stream_export(file_path, query, (), EMPLOYEE_EXPORT_FIELDS, compress, chunk_size, progress)
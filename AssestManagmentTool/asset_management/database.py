@@ -0,0 +1,132 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from .instrumentation import InstrumentedConnection, query_stats
+
+DATABASE_PATH = 'assets.db'
+READER_POOL_SIZE = 4
+STATEMENT_CACHE_SIZE = 256
+
+# Bumped when a write transaction starts and again when it ends, so an odd value means a write is in progress.
+write_generation = 0
+
+PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA foreign_keys = ON",
+)
+
+class ConnectionManager:
+    def __init__(self, path=DATABASE_PATH, reader_count=READER_POOL_SIZE):
+        self.path = path
+        self.writer_lock = threading.RLock()
+        self.write_depth = 0
+        self.writer = self.open_connection()
+        self.writer.execute("PRAGMA journal_mode = WAL")
+        self.data_version = self.writer.execute("PRAGMA data_version").fetchone()[0]
+        self.readers = queue.LifoQueue()
+        for _ in range(reader_count):
+            self.readers.put(self.open_connection())
+
+    def open_connection(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE, factory=InstrumentedConnection)
+        for pragma in PRAGMAS:
+            connection.execute(pragma)
+        return connection
+
+    @contextmanager
+    def write(self):
+        started = time.perf_counter()
+        with self.writer_lock:
+            query_stats.record_wait('writer', time.perf_counter() - started)
+            self.write_depth += 1
+            if self.write_depth == 1:
+                bump_generation()
+            try:
+                # Nested writes join the outermost transaction instead of committing it early.
+                if self.write_depth == 1:
+                    with self.writer:
+                        yield self.writer
+                else:
+                    yield self.writer
+            finally:
+                self.write_depth -= 1
+                if self.write_depth == 0:
+                    bump_generation()
+
+    # PRAGMA data_version on the writer changes only when another connection commits, which for the writer
+    # means another process. A write in progress here skips the check; the next call catches up.
+    def external_commit(self):
+        if not self.writer_lock.acquire(blocking=False):
+            return False
+        try:
+            version = self.writer.execute("PRAGMA data_version").fetchone()[0]
+            changed = version != self.data_version
+            self.data_version = version
+            return changed
+        finally:
+            self.writer_lock.release()
+
+    @contextmanager
+    def read(self):
+        started = time.perf_counter()
+        connection = self.readers.get()
+        query_stats.record_wait('reader', time.perf_counter() - started)
+        try:
+            yield connection
+        finally:
+            self.readers.put(connection)
+
+    def close(self):
+        with self.writer_lock:
+            self.writer.close()
+        while not self.readers.empty():
+            self.readers.get_nowait().close()
+
+def bump_generation():
+    global write_generation
+    write_generation += 1
+
+# Commits by other processes count as a finished write, so results cached before them are dropped.
+def current_generation():
+    global write_generation
+    if get_manager().external_commit():
+        write_generation += 2
+    return write_generation
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ConnectionManager(DATABASE_PATH)
+        return _manager
+
+def set_database_path(path):
+    global DATABASE_PATH, write_generation
+    close_database()
+    DATABASE_PATH = path
+    write_generation += 2
+
+def close_database():
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
+
+def writer():
+    return get_manager().write()
+
+def reader():
+    return get_manager().read()
+
+atexit.register(close_database)
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+ISO_DATE_GLOB = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+
+def to_iso_date(text):
+    text = text.strip()
+    for date_format in ('%d-%m-%Y', '%Y-%m-%d'):
+        try:
+            parsed = datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+        return f"{parsed.year:04d}-{parsed.month:02d}-{parsed.day:02d}"
+    raise ValueError(f"invalid date {text!r}")
+
+def from_iso_date(text):
+    year, month, day = text.split('-')
+    return f"{day}-{month}-{year}"
+
+def iso_to_display_sql(column):
+    return f"substr({column}, 9, 2) || '-' || substr({column}, 6, 2) || '-' || substr({column}, 1, 4)"
@@ -0,0 +1,188 @@
+import math
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from .database import reader, writer
+from .dates import ISO_DATE_GLOB, to_iso_date
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+METHODS = ('straight_line', 'declining_balance')
+ENGINES = ('auto', 'numpy', 'sql', 'python')
+DEFAULT_CATEGORY = 'default'
+CHUNK_SIZE = 100000
+
+DepreciationResult = namedtuple('DepreciationResult', 'as_of engine assets seconds')
+
+DEPRECIATION_TABLES = (
+    '''
+    CREATE TABLE IF NOT EXISTS DepreciationPolicies (
+        category TEXT PRIMARY KEY,
+        method TEXT NOT NULL CHECK (method IN ('straight_line', 'declining_balance')),
+        life_months INTEGER NOT NULL CHECK (life_months > 0),
+        annual_rate REAL NOT NULL DEFAULT 0,
+        salvage_percent REAL NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS DepreciationSnapshots (
+        as_of TEXT NOT NULL,
+        asset_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        cost INTEGER NOT NULL,
+        accumulated INTEGER NOT NULL,
+        book_value INTEGER NOT NULL,
+        PRIMARY KEY (as_of, asset_id)
+    ) WITHOUT ROWID
+    ''',
+    f"INSERT OR IGNORE INTO DepreciationPolicies (category, method, life_months) VALUES ('{DEFAULT_CATEGORY}', 'straight_line', 60)",
+)
+
+# Assets with a usable cost and receipt date on or before ?1 (the as-of date), joined to their
+# category's policy, or the default policy when the category is empty or has none.
+DEPRECIABLE_ASSETS = f'''
+    SELECT
+        Assets.id AS id, policy.category AS category, Assets.value AS cost,
+        CAST(substr(Assets.date_received, 1, 4) AS INTEGER) * 12 + CAST(substr(Assets.date_received, 6, 2) AS INTEGER) AS month_index,
+        policy.method AS method, policy.life_months AS life_months, policy.annual_rate AS annual_rate, policy.salvage_percent AS salvage_percent
+    FROM Assets JOIN DepreciationPolicies AS policy ON policy.category = COALESCE(
+        (SELECT category FROM DepreciationPolicies WHERE category = Assets.category), '{DEFAULT_CATEGORY}'
+    )
+    WHERE typeof(Assets.value) = 'integer' AND Assets.date_received GLOB '{ISO_DATE_GLOB}' AND Assets.date_received <= ?1
+'''
+
+# Every engine rounds with int(x + 0.5) so the three produce identical snapshots.
+SQL_SNAPSHOT = f'''
+    INSERT INTO DepreciationSnapshots (as_of, asset_id, category, cost, accumulated, book_value)
+    SELECT ?1, id, category, cost, cost - book_value, book_value FROM (
+        SELECT id, category, cost, CASE
+            WHEN method = 'straight_line' THEN cost - CAST((cost - salvage) * MIN(months, life_months) / (life_months * 1.0) + 0.5 AS INTEGER)
+            WHEN months >= life_months THEN salvage
+            ELSE MAX(salvage, CAST(cost * pow(1 - annual_rate, months / 12.0) + 0.5 AS INTEGER))
+        END AS book_value
+        FROM (
+            SELECT id, category, cost, method, life_months, annual_rate,
+                CAST(cost * salvage_percent / 100 + 0.5 AS INTEGER) AS salvage,
+                MAX(0, ?2 - month_index) AS months
+            FROM ({DEPRECIABLE_ASSETS})
+        )
+    )
+'''
+
+SNAPSHOT_INSERT = "INSERT INTO DepreciationSnapshots (as_of, asset_id, category, cost, accumulated, book_value) VALUES (?, ?, ?, ?, ?, ?)"
+
+def create_depreciation_tables(connection):
+    for statement in DEPRECIATION_TABLES:
+        connection.execute(statement)
+
+def previous_month_end(today=None):
+    return ((today or date.today()).replace(day=1) - timedelta(days=1)).isoformat()
+
+def month_index(iso_date):
+    return int(iso_date[:4]) * 12 + int(iso_date[5:7])
+
+def set_policy(category, method, life_months, annual_rate=0.0, salvage_percent=0.0):
+    if method not in METHODS:
+        raise ValueError(f"Depreciation method must be one of {', '.join(METHODS)}")
+    if life_months <= 0:
+        raise ValueError("Useful life must be at least one month")
+    if not 0 <= annual_rate < 1:
+        raise ValueError("Annual rate must be between 0 and 1")
+    if not 0 <= salvage_percent <= 100:
+        raise ValueError("Salvage percent must be between 0 and 100")
+    with writer() as connection:
+        connection.execute('''
+            INSERT INTO DepreciationPolicies (category, method, life_months, annual_rate, salvage_percent) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (category) DO UPDATE SET
+                method = excluded.method, life_months = excluded.life_months,
+                annual_rate = excluded.annual_rate, salvage_percent = excluded.salvage_percent
+        ''', (category, method, life_months, annual_rate, salvage_percent))
+
+def list_policies():
+    with reader() as connection:
+        return connection.execute("SELECT category, method, life_months, annual_rate, salvage_percent FROM DepreciationPolicies ORDER BY category").fetchall()
+
+def book_value(cost, months, method, life_months, annual_rate, salvage_percent):
+    salvage = int(cost * salvage_percent / 100 + 0.5)
+    if method == 'straight_line':
+        return cost - int((cost - salvage) * min(months, life_months) / life_months + 0.5)
+    if months >= life_months:
+        return salvage
+    return max(salvage, int(cost * math.pow(1 - annual_rate, months / 12.0) + 0.5))
+
+def asset_chunks(connection, as_of, chunk_size):
+    last_id = 0
+    while True:
+        rows = connection.execute(f"SELECT * FROM ({DEPRECIABLE_ASSETS}) WHERE id > ?2 ORDER BY id LIMIT ?3", (as_of, last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def python_snapshot(connection, as_of, chunk_size):
+    as_of_month = month_index(as_of)
+    count = 0
+    for rows in asset_chunks(connection, as_of, chunk_size):
+        snapshot = []
+        for asset_id, category, cost, received_month, method, life_months, annual_rate, salvage_percent in rows:
+            value = book_value(cost, max(0, as_of_month - received_month), method, life_months, annual_rate, salvage_percent)
+            snapshot.append((as_of, asset_id, category, cost, cost - value, value))
+        connection.executemany(SNAPSHOT_INSERT, snapshot)
+        count += len(snapshot)
+    return count
+
+def numpy_snapshot(connection, as_of, chunk_size):
+    as_of_month = month_index(as_of)
+    count = 0
+    for rows in asset_chunks(connection, as_of, chunk_size):
+        asset_id, category, cost, received_month, method, life_months, annual_rate, salvage_percent = zip(*rows)
+        cost = numpy.array(cost, dtype=numpy.int64)
+        months = numpy.maximum(0, as_of_month - numpy.array(received_month, dtype=numpy.int64))
+        life_months = numpy.array(life_months, dtype=numpy.int64)
+        annual_rate = numpy.array(annual_rate, dtype=numpy.float64)
+        salvage = (cost * numpy.array(salvage_percent, dtype=numpy.float64) / 100 + 0.5).astype(numpy.int64)
+        straight_line = cost - ((cost - salvage) * numpy.minimum(months, life_months) / life_months + 0.5).astype(numpy.int64)
+        declining = numpy.where(
+            months >= life_months, salvage,
+            numpy.maximum(salvage, (cost * numpy.power(1 - annual_rate, months / 12.0) + 0.5).astype(numpy.int64))
+        )
+        value = numpy.where(numpy.array(method) == 'straight_line', straight_line, declining)
+        connection.executemany(SNAPSHOT_INSERT, zip(
+            [as_of] * len(rows), asset_id, category, cost.tolist(), (cost - value).tolist(), value.tolist()
+        ))
+        count += len(rows)
+    return count
+
+def sql_snapshot(connection, as_of, chunk_size):
+    try:
+        connection.execute("SELECT pow(1, 1)")
+    except sqlite3.OperationalError:
+        connection.create_function('pow', 2, math.pow, deterministic=True)
+    return connection.execute(SQL_SNAPSHOT, (as_of, month_index(as_of))).rowcount
+
+SNAPSHOT_ENGINES = {'numpy': numpy_snapshot, 'sql': sql_snapshot, 'python': python_snapshot}
+
+def run_depreciation(as_of=None, engine='auto', chunk_size=CHUNK_SIZE):
+    if engine not in ENGINES:
+        raise ValueError(f"Engine must be one of {', '.join(ENGINES)}")
+    if engine == 'auto':
+        engine = 'numpy' if numpy is not None else 'sql'
+    if engine == 'numpy' and numpy is None:
+        raise ValueError("NumPy is not installed; use the sql engine")
+    as_of = to_iso_date(as_of) if as_of else previous_month_end()
+    started = time.perf_counter()
+    with writer() as connection:
+        connection.execute("DELETE FROM DepreciationSnapshots WHERE as_of = ?", (as_of,))
+        count = SNAPSHOT_ENGINES[engine](connection, as_of, chunk_size)
+    return DepreciationResult(as_of, engine, count, time.perf_counter() - started)
+
+def depreciation_report(as_of):
+    with reader() as connection:
+        return connection.execute('''
+            SELECT category, COUNT(*), SUM(cost), SUM(accumulated), SUM(book_value) FROM DepreciationSnapshots
+            WHERE as_of = ? GROUP BY category ORDER BY category
+        ''', (to_iso_date(as_of),)).fetchall()
@@ -0,0 +1,112 @@
+import threading
+from bisect import bisect_left, insort
+from . import database
+from .database import reader
+
+class EmployeeDirectory:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.employees = None
+        self.index = []
+        self.path = None
+
+    # The directory belongs to one database file; after database.set_database_path it starts over.
+    def check_path(self):
+        if self.path != database.DATABASE_PATH:
+            self.employees = None
+            self.index = []
+            self.path = database.DATABASE_PATH
+
+    def load(self):
+        with reader() as connection:
+            rows = connection.execute("SELECT id, name, department FROM Employees").fetchall()
+        with self.lock:
+            self.employees = {}
+            self.index = []
+            for employee_id, name, department in rows:
+                self.employees[employee_id] = (name, department)
+                self.index.append((name.casefold(), employee_id))
+            self.index.sort()
+
+    def ensure_loaded(self):
+        with self.lock:
+            self.check_path()
+            if self.employees is None:
+                self.load()
+
+    def invalidate(self):
+        with self.lock:
+            self.employees = None
+            self.index = []
+
+    def put(self, employee_id, name, department):
+        with self.lock:
+            self.check_path()
+            if self.employees is None:
+                return
+            self.discard(employee_id)
+            self.employees[employee_id] = (name, department)
+            insort(self.index, (name.casefold(), employee_id))
+
+    def patch(self, employee_id, changes):
+        with self.lock:
+            self.check_path()
+            if self.employees is None or employee_id not in self.employees:
+                return
+            name, department = self.employees[employee_id]
+            self.put(employee_id, changes.get('name', name), changes.get('department', department))
+
+    def remove(self, employee_id):
+        with self.lock:
+            self.check_path()
+            if self.employees is not None:
+                self.discard(employee_id)
+
+    def discard(self, employee_id):
+        employee = self.employees.pop(employee_id, None)
+        if employee is not None:
+            position = bisect_left(self.index, (employee[0].casefold(), employee_id))
+            del self.index[position]
+
+    def load_new(self):
+        with self.lock:
+            self.check_path()
+            if self.employees is None:
+                return
+            last_id = max(self.employees, default=0)
+        with reader() as connection:
+            rows = connection.execute("SELECT id, name, department FROM Employees WHERE id > ?", (last_id,)).fetchall()
+        for row in rows:
+            self.put(*row)
+
+    def get(self, employee_id):
+        self.ensure_loaded()
+        with self.lock:
+            return self.employees.get(employee_id)
+
+    def find_id(self, name):
+        self.ensure_loaded()
+        key = name.casefold()
+        with self.lock:
+            position = bisect_left(self.index, (key,))
+            if position < len(self.index) and self.index[position][0] == key:
+                return self.index[position][1]
+        return None
+
+    def names(self, prefix='', limit=None):
+        self.ensure_loaded()
+        key = prefix.casefold()
+        with self.lock:
+            position = bisect_left(self.index, (key,))
+            names = []
+            for name_key, employee_id in self.index[position:]:
+                if not name_key.startswith(key) or len(names) == limit:
+                    break
+                names.append(self.employees[employee_id][0])
+        return names
+
+    def __len__(self):
+        self.ensure_loaded()
+        return len(self.employees)
+
+employee_directory = EmployeeDirectory()
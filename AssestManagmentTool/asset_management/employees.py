@@ -0,0 +1,84 @@
+from .database import reader, writer
+from .directory import employee_directory
+from .queries import EMPLOYEE_SORT_COLUMNS, build_employee_page_query
+
+EMPLOYEE_INSERT = '''
+    INSERT INTO Employees (name, position, hire_date, department, supervisor, salary) VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+EMPLOYEE_EDITABLE_COLUMNS = EMPLOYEE_SORT_COLUMNS[1:]
+
+def add_employee(name, position, hire_date, department, supervisor, salary):
+    with writer() as connection:
+        employee_id = connection.execute(EMPLOYEE_INSERT, (name, position, hire_date, department, supervisor, salary)).lastrowid
+    employee_directory.put(employee_id, name, department)
+    return employee_id
+
+def update_employee(employee_id, name, position, hire_date, department, supervisor, salary):
+    with writer() as connection:
+        connection.execute('''
+            UPDATE Employees SET
+                name = ?, position = ?, hire_date = ?, department = ?, supervisor = ?, salary = ?
+            WHERE id = ?
+        ''', (name, position, hire_date, department, supervisor, salary, employee_id))
+    employee_directory.put(employee_id, name, department)
+
+def delete_employee(employee_id):
+    with writer() as connection:
+        connection.execute("DELETE FROM Employees WHERE id = ?", (employee_id,))
+    employee_directory.remove(employee_id)
+
+def update_employees(employee_ids, changes):
+    unknown = set(changes) - set(EMPLOYEE_EDITABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot change {', '.join(sorted(unknown))}")
+    if not changes:
+        raise ValueError("No changes given")
+    columns = [column for column in EMPLOYEE_EDITABLE_COLUMNS if column in changes]
+    assignments = ', '.join(f"{column} = ?" for column in columns)
+    parameters = [changes[column] for column in columns]
+    with writer() as connection:
+        cursor = connection.executemany(f"UPDATE Employees SET {assignments} WHERE id = ?", [parameters + [employee_id] for employee_id in employee_ids])
+        updated = cursor.rowcount
+    for employee_id in employee_ids:
+        employee_directory.patch(employee_id, changes)
+    return updated
+
+def delete_employees(employee_ids):
+    with writer() as connection:
+        cursor = connection.executemany("DELETE FROM Employees WHERE id = ?", [(employee_id,) for employee_id in employee_ids])
+        deleted = cursor.rowcount
+    for employee_id in employee_ids:
+        employee_directory.remove(employee_id)
+    return deleted
+
+def get_employee_by_id(employee_id):
+    with reader() as connection:
+        return connection.execute("SELECT * FROM Employees WHERE id = ?", (employee_id,)).fetchone()
+
+def iter_employees(page_size=1000):
+    after = None
+    while True:
+        page = fetch_employee_page(None, 'ASC', page_size, 0, after)
+        if not page:
+            return
+        yield from page
+        after = (None, page[-1][0])
+
+def count_employees():
+    with reader() as connection:
+        return connection.execute("SELECT COUNT(*) FROM Employees").fetchone()[0]
+
+def fetch_employee_page(sort_by=None, sort_order='ASC', limit=100, offset=0, after=None):
+    with reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute(*build_employee_page_query(sort_by, sort_order, limit, offset, after))
+        employees = cursor.fetchall()
+    return employees
+
+def display_employees():
+    with reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT * FROM Employees")
+        employees = cursor.fetchall()
+    return employees
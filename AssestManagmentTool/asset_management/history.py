@@ -0,0 +1,125 @@
+from datetime import datetime
+from .database import reader
+from .dates import to_iso_date
+
+# Bit i of AssetHistory.changed marks HISTORY_COLUMNS[i] as stored in that row.
+HISTORY_COLUMNS = (
+    'name', 'description', 'value', 'responsible_person', 'purchase_place', 'city', 'street',
+    'building_number', 'room', 'date_received', 'employee_id', 'category',
+)
+ALL_CHANGED = (1 << len(HISTORY_COLUMNS)) - 1
+NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+SQLITE_MAX_INTEGER = 2 ** 63 - 1
+
+# Each row holds the values a change replaced, limited to the columns it changed, together with the
+# interval [valid_from, valid_to) those values were current. valid_from is NULL when the version dates back
+# to the insert or predates the history; a 'delete' row stores every column.
+HISTORY_TABLES = (
+    f'''
+    CREATE TABLE IF NOT EXISTS AssetHistory (
+        id INTEGER PRIMARY KEY,
+        asset_id INTEGER NOT NULL,
+        valid_from TEXT,
+        valid_to TEXT NOT NULL,
+        operation TEXT NOT NULL CHECK (operation IN ('update', 'delete')),
+        changed INTEGER NOT NULL,
+        {', '.join(HISTORY_COLUMNS)}
+    )
+    ''',
+    # Asset ids only grow, so the first id inserted at each timestamp is enough to tell which assets
+    # existed at a given time, without a history row per inserted asset.
+    '''
+    CREATE TABLE IF NOT EXISTS AssetCreations (
+        created TEXT PRIMARY KEY,
+        first_id INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_asset_history_asset ON AssetHistory (asset_id, valid_to)",
+    "CREATE INDEX IF NOT EXISTS idx_asset_history_valid_to ON AssetHistory (valid_to, asset_id)",
+)
+
+CHANGED_MASK = ' | '.join(f"((old.{column} IS NOT new.{column}) << {bit})" for bit, column in enumerate(HISTORY_COLUMNS))
+PREVIOUS_CHANGE = "(SELECT MAX(valid_to) FROM AssetHistory WHERE asset_id = old.id)"
+
+HISTORY_TRIGGERS = (
+    f'''
+    CREATE TRIGGER IF NOT EXISTS assets_history_insert AFTER INSERT ON Assets BEGIN
+        INSERT OR IGNORE INTO AssetCreations (created, first_id) VALUES ({NOW}, new.id);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS assets_history_update AFTER UPDATE ON Assets WHEN ({CHANGED_MASK}) != 0 BEGIN
+        INSERT INTO AssetHistory (asset_id, valid_from, valid_to, operation, changed, {', '.join(HISTORY_COLUMNS)})
+        VALUES (old.id, {PREVIOUS_CHANGE}, {NOW}, 'update', {CHANGED_MASK},
+            {', '.join(f"CASE WHEN old.{column} IS NOT new.{column} THEN old.{column} END" for column in HISTORY_COLUMNS)});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS assets_history_delete AFTER DELETE ON Assets BEGIN
+        INSERT INTO AssetHistory (asset_id, valid_from, valid_to, operation, changed, {', '.join(HISTORY_COLUMNS)})
+        VALUES (old.id, {PREVIOUS_CHANGE}, {NOW}, 'delete', {ALL_CHANGED}, {', '.join('old.' + column for column in HISTORY_COLUMNS)});
+    END
+    ''',
+)
+
+# The value of a column at time ?1 is the one replaced by its first change after ?1, or the current value when
+# it has not changed since. The lookup is an index seek per asset and column, so resolving a snapshot only
+# visits assets changed after ?1 and never replays the log. json_array() tells a stored NULL from "no change".
+def first_change_after(column, bit):
+    return f'''(
+        SELECT json_array(AssetHistory.{column}) FROM AssetHistory
+        WHERE AssetHistory.asset_id = Changed.asset_id AND AssetHistory.valid_to > ?1 AND AssetHistory.changed & {1 << bit}
+        ORDER BY AssetHistory.valid_to, AssetHistory.id LIMIT 1
+    ) AS {column}_change'''
+
+AS_OF_ASSETS = f'''
+    Existing (before_id) AS (
+        SELECT COALESCE((SELECT first_id FROM AssetCreations WHERE created > ?1 ORDER BY created LIMIT 1), {SQLITE_MAX_INTEGER})
+    ),
+    Changes (asset_id) AS MATERIALIZED (SELECT asset_id FROM AssetHistory WHERE valid_to > ?1),
+    Changed (asset_id) AS (SELECT DISTINCT asset_id FROM Changes WHERE asset_id < (SELECT before_id FROM Existing)),
+    Restored AS MATERIALIZED (
+        SELECT Changed.asset_id AS id,
+            {', '.join(f"Assets.{column} AS current_{column}" for column in HISTORY_COLUMNS)},
+            {', '.join(first_change_after(column, bit) for bit, column in enumerate(HISTORY_COLUMNS))}
+        FROM Changed LEFT JOIN Assets ON Assets.id = Changed.asset_id
+    ),
+    AssetsAsOf AS (
+        SELECT id, name, description, value, responsible_person, purchase_place, city, street, building_number, room, date_received, employee_id
+        FROM AssetDetails WHERE id < (SELECT before_id FROM Existing) AND id NOT IN (SELECT asset_id FROM Changes)
+        UNION ALL
+        SELECT
+            Resolved.id, Resolved.name, Resolved.description, Resolved.value, COALESCE(Employees.name, Resolved.responsible_person),
+            Resolved.purchase_place, Resolved.city, Resolved.street, Resolved.building_number, Resolved.room, Resolved.date_received, Resolved.employee_id
+        FROM (
+            SELECT id,
+                {', '.join(f"CASE WHEN {column}_change IS NULL THEN current_{column} ELSE json_extract({column}_change, '$[0]') END AS {column}" for column in HISTORY_COLUMNS)}
+            FROM Restored
+        ) AS Resolved LEFT JOIN Employees ON Employees.id = Resolved.employee_id
+    )
+'''
+
+def create_history(connection):
+    for statement in HISTORY_TABLES + HISTORY_TRIGGERS:
+        connection.execute(statement)
+
+def as_of_timestamp(text):
+    text = text.strip()
+    if len(text) == 10:
+        return to_iso_date(text) + ' 23:59:59.999'
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"invalid date or time {text!r}") from None
+    return parsed.strftime('%Y-%m-%d %H:%M:%S.%f')[:23]
+
+def asset_history(asset_id):
+    with reader() as connection:
+        rows = connection.execute(
+            f"SELECT valid_from, valid_to, operation, changed, {', '.join(HISTORY_COLUMNS)} FROM AssetHistory WHERE asset_id = ? ORDER BY valid_to, id",
+            (asset_id,)
+        ).fetchall()
+    return [
+        (valid_from, valid_to, operation, {column: value for bit, (column, value) in enumerate(zip(HISTORY_COLUMNS, values)) if changed >> bit & 1})
+        for valid_from, valid_to, operation, changed, *values in rows
+    ]
@@ -0,0 +1,214 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+
+SLOW_QUERY_THRESHOLD = 0.1
+RECENT_SAMPLES = 1000
+HISTOGRAM_BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+slow_query_logger = logging.getLogger('asset_management.slow_queries')
+slow_query_threshold = SLOW_QUERY_THRESHOLD
+
+@lru_cache(maxsize=1024)
+def statement_shape(sql):
+    return LITERAL_PATTERN.sub('?', WHITESPACE_PATTERN.sub(' ', sql).strip())
+
+class LatencyStats:
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, seconds, rows=0):
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.histogram[bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+        self.recent.append(seconds)
+
+    def percentile(self, fraction):
+        if not self.recent:
+            return 0.0
+        samples = sorted(self.recent)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def summary(self):
+        return {
+            'calls': self.calls,
+            'rows': self.rows,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.calls * 1000 if self.calls else 0.0,
+            'p50_ms': self.percentile(0.5) * 1000,
+            'p95_ms': self.percentile(0.95) * 1000,
+            'p99_ms': self.percentile(0.99) * 1000,
+            'max_ms': self.max * 1000,
+            'histogram': dict(zip([f"<{bound * 1000:g}ms" for bound in HISTOGRAM_BOUNDS] + ['slower'], self.histogram)),
+        }
+
+class QueryStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements = {}
+        self.waits = {}
+
+    def record(self, shape, seconds, rows):
+        with self.lock:
+            statement = self.statements.get(shape)
+            if statement is None:
+                statement = self.statements[shape] = LatencyStats()
+            statement.add(seconds, rows)
+
+    def record_wait(self, lane, seconds):
+        with self.lock:
+            wait = self.waits.get(lane)
+            if wait is None:
+                wait = self.waits[lane] = LatencyStats()
+            wait.add(seconds)
+
+    def snapshot(self):
+        with self.lock:
+            statements = [dict(statement=shape, **stats.summary()) for shape, stats in self.statements.items()]
+            waits = {lane: stats.summary() for lane, stats in self.waits.items()}
+        statements.sort(key=lambda statement: statement['total_ms'], reverse=True)
+        return {'statements': statements, 'connection_waits': waits}
+
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+            self.waits.clear()
+
+query_stats = QueryStats()
+
+def configure_slow_query_log(file_path=None, threshold=SLOW_QUERY_THRESHOLD):
+    global slow_query_threshold
+    slow_query_threshold = threshold
+    if file_path:
+        handler = logging.FileHandler(file_path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.INFO)
+
+def log_slow_query(connection, sql, parameters, seconds, rows):
+    if not slow_query_logger.isEnabledFor(logging.INFO):
+        return
+    if parameters is None:
+        plan = "not explained (executemany)"
+    else:
+        try:
+            plan = '; '.join(row[3] for row in sqlite3.Connection.execute(connection, "EXPLAIN QUERY PLAN " + sql, parameters))
+        except sqlite3.Error as error:
+            plan = f"unavailable ({error})"
+    slow_query_logger.info("%.1f ms rows=%d sql=%s plan=%s", seconds * 1000, rows, statement_shape(sql), plan)
+
+class InstrumentedCursor(sqlite3.Cursor):
+    statement = None
+
+    def start(self, sql, parameters, executor, *args):
+        self.finish()
+        started = time.perf_counter()
+        try:
+            result = executor(self, sql, *args)
+        finally:
+            self.statement = sql
+            self.parameters = parameters
+            self.elapsed = time.perf_counter() - started
+            self.row_count = 0
+        return result
+
+    def execute(self, sql, parameters=()):
+        return self.start(sql, parameters, sqlite3.Cursor.execute, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.start(sql, None, sqlite3.Cursor.executemany, seq_of_parameters)
+
+    def timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        rows = fetch(self, *args)
+        if self.statement is not None:
+            self.elapsed += time.perf_counter() - started
+        return rows
+
+    def fetchone(self):
+        row = self.timed_fetch(sqlite3.Cursor.fetchone)
+        if row is None:
+            self.finish()
+        elif self.statement is not None:
+            self.row_count += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self.timed_fetch(sqlite3.Cursor.fetchmany, size or self.arraysize)
+        if self.statement is not None:
+            self.row_count += len(rows)
+            if len(rows) < (size or self.arraysize):
+                self.finish()
+        return rows
+
+    def fetchall(self):
+        rows = self.timed_fetch(sqlite3.Cursor.fetchall)
+        if self.statement is not None:
+            self.row_count += len(rows)
+            self.finish()
+        return rows
+
+    def finish(self):
+        if self.statement is None:
+            return
+        sql, parameters, seconds = self.statement, self.parameters, self.elapsed
+        rows = self.row_count if self.rowcount < 0 else self.rowcount
+        self.statement = None
+        query_stats.record(statement_shape(sql), seconds, rows)
+        if seconds >= slow_query_threshold:
+            log_slow_query(self.connection, sql, parameters, seconds, rows)
+
+    def close(self):
+        self.finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self.finish()
+        except sqlite3.Error:
+            pass
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def format_cache_stats(cache):
+    return (
+        f"result cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_ratio']:.0%}), {cache['patches']} patched, "
+        f"{cache['evictions']} evicted, {cache['entries']} entries, {cache['bytes'] / 1048576:.1f} of {cache['max_bytes'] / 1048576:.0f} MB"
+    )
+
+def format_stats(snapshot, limit=20):
+    lines = [f"{'calls':>8} {'rows':>10} {'total ms':>10} {'mean':>8} {'p95':>8} {'p99':>8} {'max':>8}  statement"]
+    for statement in snapshot['statements'][:limit]:
+        lines.append(
+            f"{statement['calls']:>8} {statement['rows']:>10} {statement['total_ms']:>10.1f} {statement['mean_ms']:>8.2f} "
+            f"{statement['p95_ms']:>8.2f} {statement['p99_ms']:>8.2f} {statement['max_ms']:>8.2f}  {statement['statement'][:120]}"
+        )
+    for lane, wait in sorted(snapshot['connection_waits'].items()):
+        lines.append(f"{lane} connection wait: {wait['calls']} waits, mean {wait['mean_ms']:.3f} ms, p99 {wait['p99_ms']:.3f} ms, max {wait['max_ms']:.3f} ms")
+    cache = snapshot.get('result_cache')
+    if cache:
+        lines.append(format_cache_stats(cache))
+    return '\n'.join(lines)
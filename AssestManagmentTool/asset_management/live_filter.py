@@ -0,0 +1,96 @@
+from . import queries
+from .database import reader
+from .queries import ASSET_SORT_COLUMNS, EQUALITY_FILTER_COLUMNS, NOCASE_SORT_COLUMNS, PREFIX_FILTER_COLUMNS, TEXT_SEARCH_COLUMNS, build_asset_query
+
+LIVE_RESULT_LIMIT = 20000
+CANCEL_CHECK_STEPS = 10000
+
+# SQLite's LIKE only folds ASCII letters, so in-memory matching must not use str.lower().
+ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+def like_text(value):
+    return str(value).translate(ASCII_LOWER)
+
+def memory_filterable(column):
+    return column not in EQUALITY_FILTER_COLUMNS and (column not in TEXT_SEARCH_COLUMNS or not queries.full_text_search)
+
+def narrows(previous, current):
+    previous_filters, previous_value_range, previous_date_range = previous
+    filters, value_range, date_range = current
+    if (previous_value_range, previous_date_range) != (value_range, date_range) or set(previous_filters) - set(filters):
+        return False
+    for column, value in filters.items():
+        old = previous_filters.get(column)
+        if value == old:
+            continue
+        if not memory_filterable(column):
+            return False
+        if old is None:
+            continue
+        if column in PREFIX_FILTER_COLUMNS:
+            if not like_text(value).startswith(like_text(old)):
+                return False
+        elif like_text(old) not in like_text(value):
+            return False
+    return True
+
+def row_filter(filters):
+    checks = []
+    for column, value in filters.items():
+        index = ASSET_SORT_COLUMNS.index(column)
+        if column in EQUALITY_FILTER_COLUMNS:
+            checks.append(lambda row, index=index, value=value: row[index] == value)
+        elif column in PREFIX_FILTER_COLUMNS:
+            checks.append(lambda row, index=index, value=like_text(value): row[index] is not None and like_text(row[index]).startswith(value))
+        else:
+            checks.append(lambda row, index=index, value=like_text(value): row[index] is not None and value in like_text(row[index]))
+    return lambda row: all(check(row) for check in checks)
+
+def sort_key(value, nocase=False):
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, like_text(value) if nocase else value)
+
+class MemoryResult:
+    def __init__(self, rows):
+        self.rows = rows
+        self.ordering = None
+
+    def count(self):
+        return len(self.rows)
+
+    def ordered(self, sort_by, sort_order):
+        key = (sort_by, sort_order or 'ASC') if sort_by else ('id', 'ASC')
+        if self.ordering is None or self.ordering[0] != key:
+            index = ASSET_SORT_COLUMNS.index(key[0])
+            nocase = key[0] in NOCASE_SORT_COLUMNS
+            rows = sorted(self.rows, key=lambda row: (sort_key(row[index], nocase), row[0]), reverse=key[1] == 'DESC')
+            self.ordering = (key, rows, {row[0]: position for position, row in enumerate(rows)})
+        return self.ordering[1:]
+
+    def fetch(self, sort_by, sort_order, limit, offset=0, after=None):
+        rows, positions = self.ordered(sort_by, sort_order)
+        if after is not None:
+            offset = positions[after[1]] + 1
+        return rows[offset:offset + limit]
+
+    def narrowed(self, filters, previous_filters):
+        changed = {column: value for column, value in filters.items() if previous_filters.get(column) != value}
+        return MemoryResult(list(filter(row_filter(changed), self.rows)))
+
+def live_assets(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, limit=LIVE_RESULT_LIMIT, cancelled=None):
+    count_query, count_parameters = build_asset_query(filters=filters, value_range=value_range, date_range=date_range, columns='COUNT(*)')
+    with reader() as connection:
+        if cancelled is not None:
+            connection.set_progress_handler(cancelled.is_set, CANCEL_CHECK_STEPS)
+        try:
+            total = connection.execute(count_query, count_parameters).fetchone()[0]
+            if total > limit:
+                return total, None
+            assets = connection.execute(*build_asset_query(sort_by, sort_order, filters, value_range, date_range)).fetchall()
+        finally:
+            if cancelled is not None:
+                connection.set_progress_handler(None, 0)
+    return total, MemoryResult(assets)
@@ -0,0 +1,23 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+CENT = Decimal('0.01')
+
+def to_cents(amount):
+    text = str(amount).strip().replace(' ', '').replace(',', '.')
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {amount!r}")
+    if not value.is_finite():
+        raise ValueError(f"invalid amount {amount!r}")
+    return int(value.quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+
+def from_cents(cents):
+    if not isinstance(cents, int):
+        return cents
+    sign = '-' if cents < 0 else ''
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{fraction:02d}"
+
+def cents_to_display_sql(column):
+    return f"CASE WHEN typeof({column}) = 'integer' THEN printf('%.2f', {column} / 100.0) ELSE {column} END"
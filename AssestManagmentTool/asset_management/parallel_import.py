@@ -0,0 +1,111 @@
+import csv
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .assets import ASSET_INSERT
+from .csv_io import ASSET_FIELDS, ASSET_REQUIRED, EMPLOYEE_FIELDS, EMPLOYEE_REQUIRED, ImportResult, check_header, coerce_row, write_rejects
+from .database import writer
+from .directory import employee_directory
+from .employees import EMPLOYEE_INSERT
+
+CHUNK_BYTES = 4 * 1024 * 1024
+HEADER_BYTES = 64 * 1024
+IN_FLIGHT_PER_WORKER = 2
+
+# A newline ends a record only when it is outside a quoted field, i.e. preceded by an even number of quotes.
+def first_record_end(block):
+    cut = block.find(b'\n')
+    while cut >= 0 and block.count(b'"', 0, cut) % 2:
+        cut = block.find(b'\n', cut + 1)
+    return cut + 1
+
+def last_record_end(block):
+    cut = block.rfind(b'\n')
+    while cut >= 0 and block.count(b'"', 0, cut) % 2:
+        cut = block.rfind(b'\n', 0, cut)
+    return cut + 1
+
+def read_header(file_path):
+    with open(file_path, 'rb') as source:
+        block = source.read(HEADER_BYTES)
+    end = first_record_end(block) or len(block)
+    fieldnames = next(csv.reader(io.StringIO(block[:end].decode('utf-8'), newline='')), None)
+    return fieldnames, end
+
+def chunk_ranges(file_path, start, first_line, chunk_bytes=CHUNK_BYTES):
+    size = chunk_bytes
+    with open(file_path, 'rb') as source:
+        while True:
+            source.seek(start)
+            block = source.read(size)
+            if not block:
+                return
+            end = len(block) if len(block) < size else last_record_end(block)
+            if not end:
+                size *= 2
+                continue
+            yield start, start + end, first_line
+            start += end
+            first_line += block.count(b'\n', 0, end)
+            size = chunk_bytes
+
+def parse_chunk(file_path, start, end, first_line, fieldnames, fields, required):
+    with open(file_path, 'rb') as source:
+        source.seek(start)
+        text = source.read(end - start).decode('utf-8')
+    reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames)
+    rows = []
+    errors = []
+    for row in reader:
+        try:
+            rows.append(coerce_row(row, fields, required))
+        except ValueError as error:
+            errors.append((first_line + reader.line_num - 1, str(error)))
+    return rows, errors
+
+def parallel_import(file_path, fields, required, insert_sql, workers=None, chunk_bytes=CHUNK_BYTES, rejects_path=None, progress=None):
+    started = time.perf_counter()
+    fieldnames, header_end = read_header(file_path)
+    check_header(fieldnames, fields, required)
+    workers = workers or os.cpu_count() or 1
+    imported = 0
+    errors = []
+
+    def insert_next(pending):
+        nonlocal imported
+        rows, rejected = pending.popleft().result()
+        errors.extend(rejected)
+        with writer() as connection:
+            connection.executemany(insert_sql, rows)
+        imported += len(rows)
+        if progress:
+            elapsed = time.perf_counter() - started
+            progress(imported, imported / elapsed if elapsed else 0.0)
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        try:
+            for start, end, first_line in chunk_ranges(file_path, header_end, 2, chunk_bytes):
+                pending.append(pool.submit(parse_chunk, file_path, start, end, first_line, fieldnames, fields, required))
+                if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                    insert_next(pending)
+            while pending:
+                insert_next(pending)
+        finally:
+            for future in pending:
+                future.cancel()
+    errors.sort()
+    if rejects_path:
+        write_rejects(rejects_path, errors)
+    return ImportResult(imported, len(errors), errors, time.perf_counter() - started)
+
+def parallel_import_assets_csv(file_path, workers=None, chunk_bytes=CHUNK_BYTES, rejects_path=None, progress=None):
+    return parallel_import(file_path, ASSET_FIELDS, ASSET_REQUIRED, ASSET_INSERT, workers, chunk_bytes, rejects_path, progress)
+
+def parallel_import_employees_csv(file_path, workers=None, chunk_bytes=CHUNK_BYTES, rejects_path=None, progress=None):
+    try:
+        return parallel_import(file_path, EMPLOYEE_FIELDS, EMPLOYEE_REQUIRED, EMPLOYEE_INSERT, workers, chunk_bytes, rejects_path, progress)
+    finally:
+        employee_directory.load_new()
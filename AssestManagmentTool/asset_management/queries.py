@@ -0,0 +1,221 @@
+from functools import lru_cache
+from .history import AS_OF_ASSETS, as_of_timestamp
+
+PREFIX_FILTER_COLUMNS = ('responsible_person', 'purchase_place', 'city', 'street', 'building_number', 'room')
+EQUALITY_FILTER_COLUMNS = ('value', 'employee_id')
+TEXT_SEARCH_COLUMNS = ('name', 'description')
+FILTER_COLUMNS = TEXT_SEARCH_COLUMNS + EQUALITY_FILTER_COLUMNS + PREFIX_FILTER_COLUMNS
+
+full_text_search = True
+
+PLAN_CHECKS = (
+    {'filters': {'city': 'a'}},
+    {'filters': {'city': 'a', 'street': 'b', 'building_number': 'c', 'room': 'd'}},
+    {'filters': {'room': 'a'}},
+    {'filters': {'responsible_person': 'a'}},
+    {'filters': {'employee_id': '1'}},
+    {'filters': {'value': '1'}},
+    {'filters': {'name': 'a', 'description': 'b'}},
+    {'value_range': (100, 200)},
+    {'date_range': ('2000-01-01', '2000-12-31')},
+    {'sort_by': 'value'},
+    {'sort_by': 'date_received', 'sort_order': 'DESC'},
+    {'sort_by': 'name'},
+    {'sort_by': 'city', 'sort_order': 'DESC'},
+    {'sort_by': 'street'},
+    {'sort_by': 'building_number'},
+    {'sort_by': 'room'},
+)
+
+# The page shapes behind the virtual tree views. Sorting by description, responsible_person or purchase_place
+# is left to a temporary B-tree: free text, or an expression over two tables, is not worth an index.
+PAGE_PLAN_CHECKS = (
+    {'sort_by': 'value', 'after': (100, 1)},
+    {'sort_by': 'date_received', 'sort_order': 'DESC', 'after': ('2000-01-01', 1)},
+    {'sort_by': 'name', 'after': ('a', 1)},
+    {'sort_by': 'city', 'sort_order': 'DESC', 'after': ('a', 1)},
+    {'sort_by': 'street', 'after': ('a', 1)},
+    {'sort_by': 'building_number', 'sort_order': 'DESC', 'after': ('a', 1)},
+    {'sort_by': 'room', 'after': (None, 1)},
+)
+
+ASSET_SORT_COLUMNS = ('id', 'name', 'description', 'value', 'responsible_person', 'purchase_place', 'city', 'street', 'building_number', 'room', 'date_received')
+EMPLOYEE_SORT_COLUMNS = ('id', 'name', 'position', 'hire_date', 'department', 'supervisor', 'salary')
+SORT_ORDERS = ('ASC', 'DESC')
+# Sort columns of Assets/AssetDetails and Employees that may hold NULL; the others are NOT NULL.
+NULLABLE_SORT_COLUMNS = ('description', 'responsible_person', 'purchase_place', 'department', 'supervisor')
+# Text sort columns order case-insensitively, like their filters and the NOCASE indexes that serve them.
+NOCASE_SORT_COLUMNS = (
+    'name', 'description', 'responsible_person', 'purchase_place', 'city', 'street', 'building_number', 'room',
+    'position', 'department', 'supervisor',
+)
+ASSET_COLUMNS = ', '.join(ASSET_SORT_COLUMNS)
+
+PERSON_FILTER = (
+    "(employee_id IN (SELECT id FROM Employees WHERE name LIKE ? ESCAPE '\\')"
+    " OR (employee_id IS NULL AND responsible_person LIKE ? ESCAPE '\\'))"
+)
+
+def escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def match_expression(text, column=None):
+    terms = ' '.join('"' + term.replace('"', '""') + '"*' for term in text.split())
+    if not terms:
+        return None
+    return f"{column} : ({terms})" if column else terms
+
+def filter_clause(column):
+    if column == 'responsible_person':
+        return PERSON_FILTER
+    if column in EQUALITY_FILTER_COLUMNS:
+        return f"{column} = ?"
+    return f"{column} LIKE ? ESCAPE '\\'"
+
+def filter_parameters(column, value):
+    if column in EQUALITY_FILTER_COLUMNS:
+        return [value]
+    if column == 'responsible_person':
+        return [escape_like(value) + '%'] * 2
+    if column in PREFIX_FILTER_COLUMNS:
+        return [escape_like(value) + '%']
+    return ['%' + escape_like(value) + '%']
+
+def sort_expression(sort_by):
+    return f"{sort_by} COLLATE NOCASE" if sort_by in NOCASE_SORT_COLUMNS else sort_by
+
+def normalize_sort(sort_by, sort_order, sort_columns=ASSET_SORT_COLUMNS):
+    if not sort_by:
+        return None, None
+    if sort_by not in sort_columns:
+        raise ValueError(f"Cannot sort by {sort_by!r}")
+    sort_order = (sort_order or 'ASC').upper()
+    if sort_order not in SORT_ORDERS:
+        raise ValueError(f"Invalid sort order {sort_order!r}")
+    return sort_by, sort_order
+
+# NULLs sort first ascending and last descending, so the row after the cursor depends on whether the
+# cursor's sort value is NULL; kind is 'null' for such a cursor and 'value' otherwise.
+def keyset_kind(sort_by, after):
+    if after is None:
+        return None
+    return 'null' if sort_by and sort_by != 'id' and after[0] is None else 'value'
+
+def keyset_clause(sort_by, sort_order, kind='value'):
+    operator = '<' if sort_order == 'DESC' else '>'
+    if not sort_by or sort_by == 'id':
+        return f"id {operator} ?"
+    if kind == 'null':
+        if sort_order == 'DESC':
+            return f"({sort_by} IS NULL AND id < ?)"
+        return f"({sort_by} IS NULL AND id > ? OR {sort_by} IS NOT NULL)"
+    # The collation goes on the parameter: a row value whose left side is a COLLATE expression cannot seek an index.
+    value = "? COLLATE NOCASE" if sort_by in NOCASE_SORT_COLUMNS else "?"
+    if sort_order == 'DESC' and sort_by in NULLABLE_SORT_COLUMNS:
+        return f"(({sort_by}, id) < ({value}, ?) OR {sort_by} IS NULL)"
+    return f"({sort_by}, id) {operator} ({value}, ?)"
+
+def keyset_parameters(sort_by, after):
+    sort_value, row_id = after
+    if sort_by and sort_by != 'id' and sort_value is not None:
+        return [sort_value, row_id]
+    return [row_id]
+
+def order_clause(sort_by, sort_order, paged):
+    if paged:
+        sort_order = sort_order or 'ASC'
+        if sort_by and sort_by != 'id':
+            return f" ORDER BY {sort_expression(sort_by)} {sort_order}, id {sort_order} LIMIT ? OFFSET ?"
+        return f" ORDER BY id {sort_order} LIMIT ? OFFSET ?"
+    if sort_by:
+        return f" ORDER BY {sort_expression(sort_by)} {sort_order}"
+    return ""
+
+@lru_cache(maxsize=256)
+def asset_query_sql(filter_columns, has_search, has_value_range, has_date_range, sort_by, sort_order, columns, keyset=None, paged=False, as_of=False):
+    if as_of:
+        query = f"WITH {AS_OF_ASSETS} SELECT {columns} FROM AssetsAsOf"
+    else:
+        query = f"SELECT {columns} FROM AssetDetails"
+    clauses = [filter_clause(column) for column in filter_columns]
+    if has_search:
+        clauses.append("id IN (SELECT rowid FROM AssetsSearch WHERE AssetsSearch MATCH ?)")
+    if has_value_range:
+        clauses.append("value BETWEEN ? AND ?")
+    if has_date_range:
+        clauses.append("date_received BETWEEN ? AND ?")
+    if keyset:
+        clauses.append(keyset_clause(sort_by, sort_order, keyset))
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query + order_clause(sort_by, sort_order, paged)
+
+def asset_filter_parameters(filters, value_range, date_range, as_of=None):
+    filters = filters or {}
+    unknown = set(filters) - set(FILTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot filter by {', '.join(sorted(unknown))}")
+    filter_columns = []
+    search_terms = []
+    # The search index only knows current names and descriptions, so snapshots match them with LIKE.
+    parameters = [as_of_timestamp(as_of)] if as_of else []
+    for column in FILTER_COLUMNS:
+        value = filters.get(column)
+        if not value:
+            continue
+        if full_text_search and not as_of and column in TEXT_SEARCH_COLUMNS:
+            expression = match_expression(value, column)
+            if expression:
+                search_terms.append(expression)
+        else:
+            filter_columns.append(column)
+            parameters.extend(filter_parameters(column, value))
+    if search_terms:
+        parameters.append(' AND '.join(search_terms))
+    if value_range:
+        parameters.extend(value_range)
+    if date_range:
+        parameters.extend(date_range)
+    return tuple(filter_columns), bool(search_terms), parameters
+
+def build_asset_query(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, columns=ASSET_COLUMNS, as_of=None):
+    filter_columns, has_search, parameters = asset_filter_parameters(filters, value_range, date_range, as_of)
+    sort_by, sort_order = normalize_sort(sort_by, sort_order)
+    query = asset_query_sql(filter_columns, has_search, bool(value_range), bool(date_range), sort_by, sort_order, columns, as_of=bool(as_of))
+    return query, parameters
+
+def build_asset_page_query(sort_by=None, sort_order='ASC', filters=None, value_range=None, date_range=None, limit=100, offset=0, after=None, columns=ASSET_COLUMNS):
+    filter_columns, has_search, parameters = asset_filter_parameters(filters, value_range, date_range)
+    sort_by, sort_order = normalize_sort(sort_by, sort_order)
+    query = asset_query_sql(filter_columns, has_search, bool(value_range), bool(date_range), sort_by, sort_order, columns, keyset_kind(sort_by, after), True)
+    if after is not None:
+        parameters.extend(keyset_parameters(sort_by, after))
+    parameters.extend((limit, offset))
+    return query, parameters
+
+@lru_cache(maxsize=64)
+def employee_page_sql(sort_by, sort_order, columns, keyset=None):
+    query = f"SELECT {columns} FROM Employees"
+    if keyset:
+        query += " WHERE " + keyset_clause(sort_by, sort_order, keyset)
+    return query + order_clause(sort_by, sort_order, True)
+
+def build_employee_page_query(sort_by=None, sort_order='ASC', limit=100, offset=0, after=None, columns='*'):
+    sort_by, sort_order = normalize_sort(sort_by, sort_order, EMPLOYEE_SORT_COLUMNS)
+    query = employee_page_sql(sort_by, sort_order, columns, keyset_kind(sort_by, after))
+    parameters = keyset_parameters(sort_by, after) if after is not None else []
+    parameters.extend((limit, offset))
+    return query, parameters
+
+def explain_asset_query(connection, paged=False, **query_options):
+    query, parameters = (build_asset_page_query if paged else build_asset_query)(**query_options)
+    return [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + query, parameters)]
+
+def find_full_scans(connection):
+    problems = []
+    for paged, checks in ((False, PLAN_CHECKS), (True, PAGE_PLAN_CHECKS)):
+        for check in checks:
+            plan = explain_asset_query(connection, paged, **check)
+            if any(step == 'SCAN Assets' or 'TEMP B-TREE' in step for step in plan):
+                problems.append((check, plan))
+    return problems
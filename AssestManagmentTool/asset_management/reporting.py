@@ -0,0 +1,140 @@
+from .database import reader, writer
+
+LOCATION_COLUMNS = ('city', 'street', 'building_number', 'room')
+ROLLUP_DIMENSIONS = LOCATION_COLUMNS + ('responsible_person', 'month')
+
+ROLLUP_TABLES = (
+    '''
+    CREATE TABLE IF NOT EXISTS AssetLocationTotals (
+        city TEXT NOT NULL,
+        street TEXT NOT NULL,
+        building_number TEXT NOT NULL,
+        room TEXT NOT NULL,
+        asset_count INTEGER NOT NULL,
+        total_value INTEGER NOT NULL,
+        PRIMARY KEY (city, street, building_number, room)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS AssetPersonTotals (
+        employee_id INTEGER NOT NULL,
+        person_name TEXT NOT NULL,
+        asset_count INTEGER NOT NULL,
+        total_value INTEGER NOT NULL,
+        PRIMARY KEY (employee_id, person_name)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS AssetMonthTotals (
+        month TEXT NOT NULL PRIMARY KEY,
+        asset_count INTEGER NOT NULL,
+        total_value INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''',
+)
+
+def rollup_statements(row, sign):
+    return f'''
+        INSERT INTO AssetLocationTotals (city, street, building_number, room, asset_count, total_value)
+        VALUES ({row}.city, {row}.street, {row}.building_number, {row}.room, {sign}1, {sign}{row}.value)
+        ON CONFLICT (city, street, building_number, room) DO UPDATE SET
+            asset_count = asset_count + excluded.asset_count, total_value = total_value + excluded.total_value;
+        INSERT INTO AssetPersonTotals (employee_id, person_name, asset_count, total_value)
+        VALUES (
+            COALESCE({row}.employee_id, 0),
+            CASE WHEN {row}.employee_id IS NULL THEN COALESCE({row}.responsible_person, '') ELSE '' END,
+            {sign}1, {sign}{row}.value
+        )
+        ON CONFLICT (employee_id, person_name) DO UPDATE SET
+            asset_count = asset_count + excluded.asset_count, total_value = total_value + excluded.total_value;
+        INSERT INTO AssetMonthTotals (month, asset_count, total_value)
+        VALUES (substr({row}.date_received, 1, 7), {sign}1, {sign}{row}.value)
+        ON CONFLICT (month) DO UPDATE SET
+            asset_count = asset_count + excluded.asset_count, total_value = total_value + excluded.total_value;
+    '''
+
+ROLLUP_TRIGGERS = (
+    f'''
+    CREATE TRIGGER IF NOT EXISTS assets_rollup_insert AFTER INSERT ON Assets BEGIN
+        {rollup_statements('new', '')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS assets_rollup_delete AFTER DELETE ON Assets BEGIN
+        {rollup_statements('old', '-')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS assets_rollup_update
+    AFTER UPDATE OF value, city, street, building_number, room, responsible_person, employee_id, date_received ON Assets BEGIN
+        {rollup_statements('old', '-')}
+        {rollup_statements('new', '')}
+    END
+    ''',
+)
+
+ROLLUP_REFILL = (
+    "DELETE FROM AssetLocationTotals",
+    "DELETE FROM AssetPersonTotals",
+    "DELETE FROM AssetMonthTotals",
+    '''
+    INSERT INTO AssetLocationTotals (city, street, building_number, room, asset_count, total_value)
+    SELECT city, street, building_number, room, COUNT(*), SUM(value) FROM Assets
+    GROUP BY city, street, building_number, room
+    ''',
+    '''
+    INSERT INTO AssetPersonTotals (employee_id, person_name, asset_count, total_value)
+    SELECT
+        COALESCE(employee_id, 0),
+        CASE WHEN employee_id IS NULL THEN COALESCE(responsible_person, '') ELSE '' END AS person_name,
+        COUNT(*), SUM(value)
+    FROM Assets GROUP BY 1, 2
+    ''',
+    '''
+    INSERT INTO AssetMonthTotals (month, asset_count, total_value)
+    SELECT substr(date_received, 1, 7), COUNT(*), SUM(value) FROM Assets GROUP BY 1
+    ''',
+)
+
+PERSON_REPORT = '''
+    SELECT COALESCE(Employees.name, AssetPersonTotals.person_name), asset_count, total_value
+    FROM AssetPersonTotals LEFT JOIN Employees ON Employees.id = AssetPersonTotals.employee_id
+    WHERE asset_count > 0
+    ORDER BY 1
+'''
+
+def create_rollups(connection):
+    exists = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'AssetMonthTotals'").fetchone()
+    for table in ROLLUP_TABLES:
+        connection.execute(table)
+    for trigger in ROLLUP_TRIGGERS:
+        connection.execute(trigger)
+    if not exists:
+        refill_rollups(connection)
+
+def refill_rollups(connection):
+    for statement in ROLLUP_REFILL:
+        connection.execute(statement)
+
+def rebuild_rollups():
+    with writer() as connection:
+        refill_rollups(connection)
+
+def rollup_report(dimension='city'):
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"Cannot report by {dimension!r}")
+    if dimension == 'responsible_person':
+        query = PERSON_REPORT
+    elif dimension == 'month':
+        query = "SELECT month, asset_count, total_value FROM AssetMonthTotals WHERE asset_count > 0 ORDER BY month"
+    else:
+        group = ', '.join(LOCATION_COLUMNS[:LOCATION_COLUMNS.index(dimension) + 1])
+        query = f'''
+            SELECT {group}, SUM(asset_count), SUM(total_value) FROM AssetLocationTotals
+            GROUP BY {group} HAVING SUM(asset_count) > 0 ORDER BY {group}
+        '''
+    with reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute(query)
+        report = cursor.fetchall()
+    return report
@@ -0,0 +1,185 @@
+import sys
+import threading
+from collections import OrderedDict
+from . import database
+from .queries import ASSET_COLUMNS, ASSET_SORT_COLUMNS, build_asset_query
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+PATCH_FILTER_LIMIT = 32
+
+def filter_key(filters=None, value_range=None, date_range=None):
+    return (
+        tuple(sorted((column, value) for column, value in (filters or {}).items() if value)),
+        tuple(value_range) if value_range else None,
+        tuple(date_range) if date_range else None,
+    )
+
+def row_size(row):
+    return sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+
+def result_size(value):
+    if not isinstance(value, list):
+        return sys.getsizeof(value)
+    return sys.getsizeof(value) + sum(map(row_size, value))
+
+def row_position(rows, asset_id):
+    return next((position for position, row in enumerate(rows) if row[0] == asset_id), None)
+
+def matching_filters(connection, asset_id, filter_keys):
+    matches = {}
+    for key in filter_keys:
+        filters, value_range, date_range = key
+        query, parameters = build_asset_query(filters=dict(filters), value_range=value_range, date_range=date_range, columns='id')
+        matches[key] = asset_id is not None and bool(
+            connection.execute(f"SELECT EXISTS (SELECT 1 FROM ({query}) WHERE id = ?)", parameters + [asset_id]).fetchone()[0]
+        )
+    return matches
+
+def fetch_row(connection, asset_id):
+    if asset_id is None:
+        return None
+    return connection.execute(f"SELECT {ASSET_COLUMNS} FROM AssetDetails WHERE id = ?", (asset_id,)).fetchone()
+
+class AssetPatch:
+    def __init__(self, cache, connection, asset_id):
+        self.cache = cache
+        self.generation = database.write_generation - 1
+        self.filter_keys = cache.filter_keys(self.generation)
+        self.old_row = fetch_row(connection, asset_id)
+        self.old_matches = matching_filters(connection, asset_id, self.filter_keys)
+
+    def finish(self, connection, asset_id):
+        self.new_row = fetch_row(connection, asset_id)
+        self.new_matches = matching_filters(connection, asset_id, self.filter_keys)
+
+    def apply(self):
+        self.cache.apply_patch(self)
+
+    # Returns the patched (value, size), or None when the entry cannot be patched and has to be dropped.
+    def patched(self, key, value, size):
+        kind, filters, sort_by = key[:3]
+        if filters not in self.new_matches:
+            return None
+        old_in, new_in = self.old_matches[filters], self.new_matches[filters]
+        if kind == 'count':
+            return value + new_in - old_in, size
+        if not old_in and not new_in:
+            return value, size
+        sort_index = ASSET_SORT_COLUMNS.index(sort_by) if sort_by else 0
+        if old_in and new_in and self.old_row[sort_index] == self.new_row[sort_index]:
+            position = row_position(value, self.old_row[0])
+            if position is None:
+                return value, size
+            value = value.copy()
+            value[position] = self.new_row
+            return value, size - row_size(self.old_row) + row_size(self.new_row)
+        if kind == 'rows' and old_in and not new_in:
+            position = row_position(value, self.old_row[0])
+            if position is None:
+                return value, size
+            return value[:position] + value[position + 1:], size - row_size(self.old_row)
+        return None
+
+class ResultCache:
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.generation = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.patches = 0
+
+    def get(self, key):
+        generation = database.current_generation()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def put(self, key, generation, value):
+        if generation % 2 or generation != database.write_generation:
+            return
+        size = result_size(value)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if generation != self.generation:
+                self.expire(generation)
+            self.discard(key)
+            self.entries[key] = (generation, value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self.discard(next(iter(self.entries)))
+                self.evictions += 1
+
+    def cached(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            generation = database.write_generation
+            value = compute()
+            self.put(key, generation, value)
+        return value
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def expire(self, generation):
+        for key in [key for key, entry in self.entries.items() if entry[0] != generation]:
+            self.discard(key)
+        self.generation = generation
+
+    def filter_keys(self, generation):
+        with self.lock:
+            keys = {key[1] for key, entry in self.entries.items() if entry[0] == generation}
+        return keys if len(keys) <= PATCH_FILTER_LIMIT else set()
+
+    def begin_patch(self, connection, asset_id=None):
+        return AssetPatch(self, connection, asset_id)
+
+    def apply_patch(self, patch):
+        generation = patch.generation + 2
+        with self.lock:
+            if database.write_generation != generation:
+                return
+            for key, entry in list(self.entries.items()):
+                patched = patch.patched(key, entry[1], entry[2]) if entry[0] == patch.generation else None
+                self.discard(key)
+                if patched is not None:
+                    self.entries[key] = (generation, *patched)
+                    self.bytes += patched[1]
+                    self.patches += 1
+            self.generation = generation
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = self.misses = self.evictions = self.patches = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'patches': self.patches,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+asset_cache = ResultCache()
@@ -0,0 +1,220 @@
+import sqlite3
+from . import queries
+from .database import writer
+from .depreciation import create_depreciation_tables
+from .dates import ISO_DATE_GLOB, to_iso_date
+from .history import create_history
+from .reporting import create_rollups, refill_rollups
+
+MIGRATION_BATCH_SIZE = 5000
+MONEY_COLUMNS = (('Assets', 'value'), ('Employees', 'salary'))
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_assets_value ON Assets (value)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_date_received ON Assets (date_received)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_location ON Assets (city COLLATE NOCASE, street COLLATE NOCASE, building_number COLLATE NOCASE, room COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_room ON Assets (room COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_name ON Assets (name COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_city ON Assets (city COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_street ON Assets (street COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_building_number ON Assets (building_number COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_employee_id ON Assets (employee_id)",
+    "CREATE INDEX IF NOT EXISTS idx_assets_external_id ON Assets (external_id)",
+    "CREATE INDEX IF NOT EXISTS idx_employees_name ON Employees (name COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_employees_department ON Employees (department COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_employees_hire_date ON Employees (hire_date)",
+)
+
+ASSET_DETAILS_VIEW = '''
+    CREATE VIEW IF NOT EXISTS AssetDetails AS
+    SELECT
+        Assets.id AS id, Assets.name AS name, Assets.description AS description, Assets.value AS value,
+        COALESCE(Employees.name, Assets.responsible_person) AS responsible_person,
+        Assets.purchase_place AS purchase_place, Assets.city AS city, Assets.street AS street,
+        Assets.building_number AS building_number, Assets.room AS room, Assets.date_received AS date_received,
+        Assets.employee_id AS employee_id
+    FROM Assets LEFT JOIN Employees ON Employees.id = Assets.employee_id
+'''
+
+EMPLOYEE_DELETE_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS employees_delete_unlink BEFORE DELETE ON Employees BEGIN
+        UPDATE Assets SET responsible_person = old.name WHERE employee_id = old.id;
+    END
+'''
+
+# sync_hash describes the feed row the asset was last synced from; an edit made outside the sync clears it
+# so the next sync compares against nothing and rewrites the asset instead of reporting it unchanged.
+SYNC_HASH_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS assets_sync_hash_reset
+    AFTER UPDATE OF name, description, value, responsible_person, purchase_place, city, street, building_number, room,
+        date_received, employee_id, external_id ON Assets
+    WHEN new.sync_hash IS old.sync_hash AND new.sync_hash IS NOT NULL BEGIN
+        UPDATE Assets SET sync_hash = NULL WHERE id = new.id;
+    END
+'''
+
+SEARCH_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS assets_search_insert AFTER INSERT ON Assets BEGIN
+        INSERT INTO AssetsSearch (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS assets_search_delete AFTER DELETE ON Assets BEGIN
+        INSERT INTO AssetsSearch (AssetsSearch, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS assets_search_update AFTER UPDATE OF name, description ON Assets BEGIN
+        INSERT INTO AssetsSearch (AssetsSearch, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO AssetsSearch (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    ''',
+)
+
+def migrate_dates_to_iso(connection, table, column):
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            f"SELECT id, {column} FROM {table} WHERE id > ? AND {column} NOT GLOB ? ORDER BY id LIMIT ?",
+            (last_id, ISO_DATE_GLOB, MIGRATION_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for row_id, value in rows:
+            try:
+                updates.append((to_iso_date(value), row_id))
+            except ValueError:
+                pass
+        connection.executemany(f"UPDATE {table} SET {column} = ? WHERE id = ?", updates)
+        connection.commit()
+        last_id = rows[-1][0]
+
+def id_batches(connection, table, batch_size=MIGRATION_BATCH_SIZE, commit=True):
+    last_id = 0
+    while True:
+        batch_end = connection.execute(
+            f"SELECT MAX(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+            (last_id, batch_size)
+        ).fetchone()[0]
+        if batch_end is None:
+            break
+        yield last_id, batch_end
+        if commit:
+            connection.commit()
+        last_id = batch_end
+
+def link_responsible_employees(connection):
+    for first_id, last_id in id_batches(connection, 'Assets'):
+        connection.execute('''
+            UPDATE Assets SET employee_id = (
+                SELECT MIN(id) FROM Employees WHERE Employees.name = Assets.responsible_person COLLATE NOCASE
+            )
+            WHERE id > ? AND id <= ? AND employee_id IS NULL AND responsible_person IS NOT NULL
+        ''', (first_id, last_id))
+
+# Not idempotent: the old DECIMAL columns already stored whole amounts as integers, so a converted row looks
+# like an unconverted one. The caller runs it in the transaction that records the new schema version.
+def migrate_money_to_cents(connection, table, column):
+    for first_id, last_id in id_batches(connection, table, commit=False):
+        connection.execute(f'''
+            UPDATE {table} SET {column} = CAST(round({column} * 100) AS INTEGER)
+            WHERE id > ? AND id <= ? AND typeof({column}) IN ('integer', 'real')
+        ''', (first_id, last_id))
+
+def create_search_index(connection):
+    exists = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'AssetsSearch'").fetchone()
+    connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS AssetsSearch USING fts5(name, description, content='Assets', content_rowid='id')")
+    for trigger in SEARCH_TRIGGERS:
+        connection.execute(trigger)
+    if not exists:
+        connection.execute("INSERT INTO AssetsSearch (AssetsSearch) VALUES ('rebuild')")
+
+def create_tables():
+    with writer() as connection:
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS Assets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                value INTEGER NOT NULL,
+                responsible_person TEXT,
+                purchase_place TEXT,
+                city TEXT NOT NULL,
+                street TEXT NOT NULL,
+                building_number TEXT NOT NULL,
+                room TEXT NOT NULL,
+                date_received TEXT NOT NULL,
+                employee_id INTEGER REFERENCES Employees (id) ON DELETE SET NULL,
+                external_id TEXT,
+                sync_hash TEXT,
+                category TEXT
+            )
+        ''')
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS Employees (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                position TEXT NOT NULL,
+                hire_date TEXT NOT NULL,
+                department TEXT,
+                supervisor TEXT,
+                salary INTEGER NOT NULL
+            )
+        ''')
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA table_info(Assets)")
+        columns = [info[1] for info in cursor.fetchall()]
+        if 'date_received' not in columns:
+            connection.execute("ALTER TABLE Assets ADD COLUMN date_received TEXT NOT NULL DEFAULT '2000-01-01'")
+        if 'employee_id' not in columns:
+            connection.execute("ALTER TABLE Assets ADD COLUMN employee_id INTEGER REFERENCES Employees (id) ON DELETE SET NULL")
+        if 'external_id' not in columns:
+            connection.execute("ALTER TABLE Assets ADD COLUMN external_id TEXT")
+        if 'sync_hash' not in columns:
+            connection.execute("ALTER TABLE Assets ADD COLUMN sync_hash TEXT")
+        if 'category' not in columns:
+            connection.execute("ALTER TABLE Assets ADD COLUMN category TEXT")
+        
+        cursor.execute("PRAGMA table_info(Employees)")
+        columns = [info[1] for info in cursor.fetchall()]
+        if 'department' not in columns:
+            connection.execute("ALTER TABLE Employees ADD COLUMN department TEXT")
+        if 'supervisor' not in columns:
+            connection.execute("ALTER TABLE Employees ADD COLUMN supervisor TEXT")
+        if 'salary' not in columns:
+            connection.execute("ALTER TABLE Employees ADD COLUMN salary INTEGER NOT NULL DEFAULT 0")
+
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            migrate_dates_to_iso(connection, 'Assets', 'date_received')
+            migrate_dates_to_iso(connection, 'Employees', 'hire_date')
+            connection.execute("PRAGMA user_version = 1")
+
+        for index in INDEXES:
+            connection.execute(index)
+        if version < 2:
+            connection.execute("DROP INDEX IF EXISTS idx_assets_responsible_person")
+            link_responsible_employees(connection)
+            connection.execute("PRAGMA user_version = 2")
+        if version < 3:
+            if not connection.in_transaction:
+                connection.execute("BEGIN IMMEDIATE")
+            for table, column in MONEY_COLUMNS:
+                migrate_money_to_cents(connection, table, column)
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'AssetMonthTotals'").fetchone():
+                refill_rollups(connection)
+            connection.execute("PRAGMA user_version = 3")
+            connection.commit()
+        connection.execute(ASSET_DETAILS_VIEW)
+        connection.execute(EMPLOYEE_DELETE_TRIGGER)
+        connection.execute(SYNC_HASH_TRIGGER)
+        create_rollups(connection)
+        create_depreciation_tables(connection)
+        create_history(connection)
+        try:
+            create_search_index(connection)
+        except sqlite3.OperationalError:
+            queries.full_text_search = False
+        connection.execute("PRAGMA optimize")
@@ -0,0 +1,439 @@
+import asyncio
+import base64
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+from . import database
+from .assets import ASSET_EDITABLE_COLUMNS, add_asset, count_assets, delete_assets, fetch_asset_page, get_asset_by_id, update_assets
+from .dates import to_iso_date
+from .employees import EMPLOYEE_EDITABLE_COLUMNS, add_employee, delete_employees, fetch_employee_page, get_employee_by_id, update_employees
+from .instrumentation import query_stats
+from .money import from_cents, to_cents
+from .queries import ASSET_SORT_COLUMNS, EMPLOYEE_SORT_COLUMNS, FILTER_COLUMNS
+from .result_cache import asset_cache
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+STREAM_BATCH_SIZE = 200
+MAX_PENDING_READS = 256
+MAX_PENDING_WRITES = 1024
+MAX_GROUP_SIZE = 256
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+
+ASSET_REQUIRED = ('name', 'value', 'city', 'street', 'building_number', 'room', 'date_received')
+ASSET_OPTIONAL = ('description', 'responsible_person', 'purchase_place')
+EMPLOYEE_REQUIRED = ('name', 'position', 'hire_date', 'salary')
+EMPLOYEE_OPTIONAL = ('department', 'supervisor')
+MONEY_FIELDS = ('value', 'salary')
+
+server_logger = logging.getLogger('asset_management.server')
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Request:
+    def __init__(self, method, path, parameters, headers, body):
+        self.method = method
+        self.path = path
+        self.parameters = parameters
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self):
+        return self.headers.get('connection', '').lower() != 'close'
+
+    def json(self):
+        try:
+            payload = json.loads(self.body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return payload
+
+async def read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HTTPError(431, "Too many headers")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length") from None
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b''
+    url = urlsplit(target)
+    return Request(method.upper(), url.path.rstrip('/') or '/', dict(parse_qsl(url.query)), headers, body)
+
+def response_head(status, keep_alive, headers):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", "Content-Type: application/json"]
+    lines += [f"{name}: {value}" for name, value in headers]
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+async def send_json(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(response_head(status, keep_alive, [('Content-Length', len(body))]) + body)
+    await writer.drain()
+
+def chunk(data):
+    return f"{len(data):x}\r\n".encode('latin-1') + data + b"\r\n"
+
+# Pages go out with chunked encoding a batch of rows at a time, so a large page is never held as one JSON string
+# and a slow client holds back only its own connection.
+async def send_rows(writer, key, rows, row_object, extra, keep_alive=True):
+    writer.write(response_head(200, keep_alive, [('Transfer-Encoding', 'chunked')]))
+    writer.write(chunk(f'{{"{key}": ['.encode('utf-8')))
+    for start in range(0, len(rows), STREAM_BATCH_SIZE):
+        batch = ', '.join(json.dumps(row_object(row)) for row in rows[start:start + STREAM_BATCH_SIZE])
+        writer.write(chunk(((', ' if start else '') + batch).encode('utf-8')))
+        await writer.drain()
+    tail = ''.join(f', "{name}": {json.dumps(value)}' for name, value in extra.items())
+    writer.write(chunk(f"]{tail}}}".encode('utf-8')) + b"0\r\n\r\n")
+    await writer.drain()
+
+def asset_object(row):
+    asset = dict(zip(ASSET_SORT_COLUMNS, row))
+    asset['value'] = from_cents(asset['value'])
+    return asset
+
+def employee_object(row):
+    employee = dict(zip(EMPLOYEE_SORT_COLUMNS, row))
+    employee['salary'] = from_cents(employee['salary'])
+    return employee
+
+def encode_cursor(sort_value, row_id):
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode('utf-8')).decode('ascii')
+
+def decode_cursor(text):
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(text.encode('ascii')))
+    except ValueError:
+        raise HTTPError(400, "Invalid page cursor") from None
+    if not isinstance(cursor, list) or len(cursor) != 2 or type(cursor[1]) is not int or isinstance(cursor[0], (list, dict)):
+        raise HTTPError(400, "Invalid page cursor")
+    return cursor[0], cursor[1]
+
+def page_options(parameters, sort_columns):
+    try:
+        limit = int(parameters.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise HTTPError(400, "limit must be a number") from None
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPError(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    sort_by = parameters.get('sort_by') or None
+    if sort_by is not None and sort_by not in sort_columns:
+        raise HTTPError(400, f"Cannot sort by {sort_by!r}")
+    after = decode_cursor(parameters['after']) if parameters.get('after') else None
+    return sort_by, parameters.get('sort_order', 'ASC').upper(), limit, after
+
+def next_cursor(rows, limit, sort_by, sort_columns):
+    if len(rows) < limit:
+        return None
+    last_row = rows[-1]
+    return encode_cursor(last_row[sort_columns.index(sort_by)] if sort_by else None, last_row[0])
+
+def asset_filters(parameters):
+    filters = {column: parameters[column] for column in FILTER_COLUMNS if parameters.get(column)}
+    if 'value' in filters:
+        filters['value'] = to_cents(filters['value'])
+    value_range = date_range = None
+    if parameters.get('min_value') and parameters.get('max_value'):
+        value_range = (to_cents(parameters['min_value']), to_cents(parameters['max_value']))
+    if parameters.get('date_from') and parameters.get('date_to'):
+        date_range = (to_iso_date(parameters['date_from']), to_iso_date(parameters['date_to']))
+    return filters, value_range, date_range
+
+# Money may come as a JSON number or a string; every other field is text, dates included.
+def check_field_types(payload, fields):
+    for field in fields:
+        value = payload.get(field)
+        if value is None:
+            continue
+        if field in MONEY_FIELDS:
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise HTTPError(400, f"{field} must be a number or a string")
+        elif not isinstance(value, str):
+            raise HTTPError(400, f"{field} must be a string")
+
+def record_fields(payload, required, optional):
+    missing = [field for field in required if payload.get(field) in (None, '')]
+    if missing:
+        raise HTTPError(400, f"Missing {', '.join(missing)}")
+    check_field_types(payload, required + optional)
+    return [payload[field] for field in required] + [payload.get(field) for field in optional]
+
+def clean_changes(payload, editable_columns):
+    unknown = set(payload) - set(editable_columns)
+    if unknown:
+        raise HTTPError(400, f"Cannot change {', '.join(sorted(unknown))}")
+    check_field_types(payload, payload)
+    changes = dict(payload)
+    for column in ('value', 'salary'):
+        if changes.get(column) is not None:
+            changes[column] = to_cents(changes[column])
+    for column in ('date_received', 'hire_date'):
+        if changes.get(column):
+            changes[column] = to_iso_date(changes[column])
+    return changes
+
+def new_asset(payload):
+    name, value, city, street, building_number, room, date_received, description, responsible_person, purchase_place = record_fields(payload, ASSET_REQUIRED, ASSET_OPTIONAL)
+    return partial(add_asset, name, description, to_cents(value), responsible_person, purchase_place, city, street, building_number, room, to_iso_date(date_received))
+
+def new_employee(payload):
+    name, position, hire_date, salary, department, supervisor = record_fields(payload, EMPLOYEE_REQUIRED, EMPLOYEE_OPTIONAL)
+    return partial(add_employee, name, position, to_iso_date(hire_date), department, supervisor, to_cents(salary))
+
+# Runs a group of queued writes in one transaction. Each write gets its own savepoint, so one failing
+# write is rolled back on its own and the rest of the group still commits. The explicit BEGIN matters:
+# outside a transaction a SAVEPOINT opens one and its RELEASE commits it.
+def run_write_group(writes):
+    results = []
+    try:
+        with database.writer() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            for write in writes:
+                connection.execute("SAVEPOINT api_write")
+                try:
+                    results.append((write(), None))
+                except Exception as error:
+                    connection.execute("ROLLBACK TO api_write")
+                    results.append((None, error))
+                connection.execute("RELEASE api_write")
+    except sqlite3.Error as error:
+        return [(None, error)] * len(writes)
+    return results
+
+class AssetServer:
+    def __init__(self, readers=database.READER_POOL_SIZE, max_group_size=MAX_GROUP_SIZE):
+        self.read_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='api-read')
+        self.write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-write')
+        self.max_group_size = max_group_size
+        self.write_queue = None
+        self.pending_reads = 0
+        self.requests = 0
+        self.errors = 0
+        self.commits = 0
+        self.writes = 0
+        self.started = time.perf_counter()
+        self.routes = {
+            ('GET', 'assets'): self.list_assets,
+            ('GET', 'assets/count'): self.count_matching_assets,
+            ('POST', 'assets'): self.create_asset,
+            ('GET', 'assets/{id}'): self.get_asset,
+            ('PATCH', 'assets/{id}'): self.change_asset,
+            ('DELETE', 'assets/{id}'): self.remove_asset,
+            ('GET', 'employees'): self.list_employees,
+            ('POST', 'employees'): self.create_employee,
+            ('GET', 'employees/{id}'): self.get_employee,
+            ('PATCH', 'employees/{id}'): self.change_employee,
+            ('DELETE', 'employees/{id}'): self.remove_employee,
+            ('GET', 'stats'): self.stats,
+        }
+
+    async def read(self, function, *args):
+        if self.pending_reads >= MAX_PENDING_READS:
+            raise HTTPError(503, "Too many pending reads")
+        self.pending_reads += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.read_pool, partial(function, *args))
+        finally:
+            self.pending_reads -= 1
+
+    async def write(self, function, *args):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.write_queue.put_nowait((partial(function, *args), future))
+        except asyncio.QueueFull:
+            raise HTTPError(503, "Too many pending writes") from None
+        return await future
+
+    # Writes that queue up while a group is committing are committed together in the next group.
+    async def write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            group = [await self.write_queue.get()]
+            while len(group) < self.max_group_size and not self.write_queue.empty():
+                group.append(self.write_queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(self.write_pool, run_write_group, [write for write, _ in group])
+            except Exception as error:
+                results = [(None, error)] * len(group)
+            self.commits += 1
+            self.writes += len(group)
+            for (_, future), (result, error) in zip(group, results):
+                if future.cancelled():
+                    continue
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+    def route(self, request):
+        parts = request.path.strip('/').split('/')
+        record_id = None
+        if len(parts) == 2 and parts[1].isdigit():
+            record_id = int(parts[1])
+            parts[1] = '{id}'
+        handler = self.routes.get((request.method, '/'.join(parts)))
+        if handler is None:
+            if any(path == '/'.join(parts) for _, path in self.routes):
+                raise HTTPError(405, f"{request.method} is not allowed on {request.path}")
+            raise HTTPError(404, f"No route for {request.path}")
+        return handler, record_id
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as error:
+                    await send_json(writer, error.status, {'error': str(error)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                self.requests += 1
+                try:
+                    handler, record_id = self.route(request)
+                    await handler(request, writer, record_id)
+                except HTTPError as error:
+                    self.errors += 1
+                    await send_json(writer, error.status, {'error': str(error)}, request.keep_alive)
+                except ValueError as error:
+                    self.errors += 1
+                    await send_json(writer, 400, {'error': str(error)}, request.keep_alive)
+                except sqlite3.Error as error:
+                    self.errors += 1
+                    await send_json(writer, 409 if isinstance(error, sqlite3.IntegrityError) else 500, {'error': str(error)}, request.keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception:
+                    # Part of a streamed response may already be out, so the connection cannot be reused.
+                    self.errors += 1
+                    server_logger.exception("%s %s failed", request.method, request.path)
+                    await send_json(writer, 500, {'error': "Internal server error"}, keep_alive=False)
+                    break
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def list_assets(self, request, writer, record_id):
+        sort_by, sort_order, limit, after = page_options(request.parameters, ASSET_SORT_COLUMNS)
+        filters, value_range, date_range = asset_filters(request.parameters)
+        rows = await self.read(fetch_asset_page, sort_by, sort_order, filters, value_range, date_range, limit, 0, after)
+        await send_rows(writer, 'assets', rows, asset_object, {'next': next_cursor(rows, limit, sort_by, ASSET_SORT_COLUMNS)}, request.keep_alive)
+
+    async def count_matching_assets(self, request, writer, record_id):
+        filters, value_range, date_range = asset_filters(request.parameters)
+        await send_json(writer, 200, {'count': await self.read(count_assets, filters, value_range, date_range)}, request.keep_alive)
+
+    async def get_asset(self, request, writer, record_id):
+        row = await self.read(get_asset_by_id, record_id)
+        if row is None:
+            raise HTTPError(404, f"Asset {record_id} not found")
+        await send_json(writer, 200, asset_object(row), request.keep_alive)
+
+    async def create_asset(self, request, writer, record_id):
+        asset_id = await self.write(new_asset(request.json()))
+        await send_json(writer, 201, {'id': asset_id}, request.keep_alive)
+
+    async def change_asset(self, request, writer, record_id):
+        changes = clean_changes(request.json(), ASSET_EDITABLE_COLUMNS)
+        if not await self.write(update_assets, [record_id], changes):
+            raise HTTPError(404, f"Asset {record_id} not found")
+        await send_json(writer, 200, {'id': record_id}, request.keep_alive)
+
+    async def remove_asset(self, request, writer, record_id):
+        if not await self.write(delete_assets, [record_id]):
+            raise HTTPError(404, f"Asset {record_id} not found")
+        await send_json(writer, 200, {'id': record_id}, request.keep_alive)
+
+    async def list_employees(self, request, writer, record_id):
+        sort_by, sort_order, limit, after = page_options(request.parameters, EMPLOYEE_SORT_COLUMNS)
+        rows = await self.read(fetch_employee_page, sort_by, sort_order, limit, 0, after)
+        await send_rows(writer, 'employees', rows, employee_object, {'next': next_cursor(rows, limit, sort_by, EMPLOYEE_SORT_COLUMNS)}, request.keep_alive)
+
+    async def get_employee(self, request, writer, record_id):
+        row = await self.read(get_employee_by_id, record_id)
+        if row is None:
+            raise HTTPError(404, f"Employee {record_id} not found")
+        await send_json(writer, 200, employee_object(row), request.keep_alive)
+
+    async def create_employee(self, request, writer, record_id):
+        employee_id = await self.write(new_employee(request.json()))
+        await send_json(writer, 201, {'id': employee_id}, request.keep_alive)
+
+    async def change_employee(self, request, writer, record_id):
+        changes = clean_changes(request.json(), EMPLOYEE_EDITABLE_COLUMNS)
+        if not await self.write(update_employees, [record_id], changes):
+            raise HTTPError(404, f"Employee {record_id} not found")
+        await send_json(writer, 200, {'id': record_id}, request.keep_alive)
+
+    async def remove_employee(self, request, writer, record_id):
+        if not await self.write(delete_employees, [record_id]):
+            raise HTTPError(404, f"Employee {record_id} not found")
+        await send_json(writer, 200, {'id': record_id}, request.keep_alive)
+
+    async def stats(self, request, writer, record_id):
+        await send_json(writer, 200, {
+            'uptime_seconds': time.perf_counter() - self.started,
+            'requests': self.requests,
+            'errors': self.errors,
+            'pending_reads': self.pending_reads,
+            'pending_writes': self.write_queue.qsize(),
+            'writes': self.writes,
+            'commits': self.commits,
+            'writes_per_commit': self.writes / self.commits if self.commits else 0.0,
+            'result_cache': asset_cache.stats(),
+            'queries': query_stats.snapshot(),
+        }, request.keep_alive)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        self.write_queue = asyncio.Queue(MAX_PENDING_WRITES)
+        write_task = asyncio.create_task(self.write_loop())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready:
+            ready(server.sockets[0].getsockname())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            write_task.cancel()
+            self.read_pool.shutdown()
+            self.write_pool.shutdown()
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, readers=database.READER_POOL_SIZE, max_group_size=MAX_GROUP_SIZE, ready=None):
+    try:
+        asyncio.run(AssetServer(readers, max_group_size).serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
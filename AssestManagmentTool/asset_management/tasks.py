@@ -0,0 +1,116 @@
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+READ_WORKERS = 4
+POLL_INTERVAL = 50
+
+class TaskCancelled(Exception):
+    pass
+
+class Task:
+    def __init__(self, executor, on_done=None, on_error=None, on_progress=None):
+        self.executor = executor
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise TaskCancelled("Task was cancelled")
+
+    def report(self, *progress):
+        self.check_cancelled()
+        if self.on_progress:
+            self.executor.results.put((self.on_progress, progress))
+
+    def finish(self, result, error):
+        if error is None:
+            if self.on_done:
+                self.on_done(result)
+        elif self.on_error:
+            self.on_error(error)
+
+class TaskExecutor:
+    def __init__(self, root=None, read_workers=READ_WORKERS, poll_interval=POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.read_pool = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='db-read')
+        self.write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-write')
+        self.results = queue.Queue()
+        self.pending = 0
+        self.pending_lock = threading.Lock()
+        self.closed = False
+        if root is not None:
+            root.after(poll_interval, self.poll)
+
+    def submit(self, function, *args, write=False, on_done=None, on_error=None, on_progress=None, with_progress=False, **kwargs):
+        task = Task(self, on_done, on_error, on_progress)
+        if with_progress:
+            kwargs['progress'] = task.report
+        with self.pending_lock:
+            self.pending += 1
+        pool = self.write_pool if write else self.read_pool
+        task.future = pool.submit(self.run, task, function, args, kwargs)
+        return task
+
+    def run(self, task, function, args, kwargs):
+        result = error = None
+        try:
+            task.check_cancelled()
+            result = function(*args, **kwargs)
+        except Exception as exception:
+            error = exception
+        self.results.put((task.finish, (result, error)))
+        with self.pending_lock:
+            self.pending -= 1
+
+    def dispatch(self, block=False, timeout=None):
+        try:
+            callback, args = self.results.get(block, timeout)
+        except queue.Empty:
+            return False
+        # A failing callback is reported like any other Tk callback error and must not stop the
+        # callbacks queued behind it.
+        try:
+            callback(*args)
+        except Exception:
+            self.report_exception()
+        return True
+
+    def report_exception(self):
+        if self.root is not None:
+            self.root.report_callback_exception(*sys.exc_info())
+        else:
+            sys.excepthook(*sys.exc_info())
+
+    def poll(self):
+        try:
+            while self.dispatch():
+                pass
+        finally:
+            if not self.closed:
+                self.root.after(self.poll_interval, self.poll)
+
+    def drain(self, timeout=0.1):
+        while True:
+            with self.pending_lock:
+                idle = self.pending == 0
+            if idle and self.results.empty():
+                return
+            self.dispatch(True, timeout)
+
+    def shutdown(self):
+        self.closed = True
+        self.read_pool.shutdown(wait=False, cancel_futures=True)
+        self.write_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,82 @@
+import argparse
+import csv
+import os
+import random
+import sys
+from datetime import date, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_management.csv_io import ASSET_FIELDS, EMPLOYEE_FIELDS
+
+CITIES = ('Krakow', 'Warsaw', 'Gdansk', 'Poznan', 'Wroclaw', 'Lodz', 'Katowice', 'Lublin', 'Szczecin', 'Bialystok', 'Rzeszow', 'Torun')
+STREETS = ('Main', 'Long', 'Market', 'Station', 'Park', 'Church', 'Mill', 'Bridge', 'Forest', 'Garden', 'River', 'School')
+ITEMS = ('Laptop', 'Monitor', 'Desk', 'Chair', 'Printer', 'Phone', 'Projector', 'Cabinet', 'Router', 'Scanner', 'Tablet', 'Whiteboard')
+BRANDS = ('Dell', 'HP', 'Lenovo', 'Apple', 'Samsung', 'Ikea', 'Cisco', 'Epson', 'Brother', 'Logitech')
+ADJECTIVES = ('black', 'white', 'refurbished', 'new', 'portable', 'ergonomic', 'wireless', 'large', 'compact', 'shared')
+DEPARTMENTS = ('IT', 'Finance', 'HR', 'Sales', 'Logistics', 'Legal', 'Facilities', 'Research')
+POSITIONS = ('Engineer', 'Analyst', 'Manager', 'Specialist', 'Assistant', 'Director', 'Technician')
+FIRST_NAMES = ('Anna', 'Piotr', 'Maria', 'Jan', 'Katarzyna', 'Tomasz', 'Agnieszka', 'Pawel', 'Ewa', 'Michal', 'Zofia', 'Adam')
+LAST_NAMES = ('Nowak', 'Kowalski', 'Wisniewski', 'Wojcik', 'Kaminski', 'Lewandowski', 'Zielinski', 'Szymanski', 'Wozniak', 'Dabrowski')
+
+FIRST_DATE = date(2000, 1, 1)
+DATE_SPAN = (date(2024, 12, 31) - FIRST_DATE).days
+
+def zipf_weights(count, exponent=1.1):
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+def employee_names(count, seed=0):
+    generator = random.Random(seed)
+    return [f"{generator.choice(FIRST_NAMES)} {generator.choice(LAST_NAMES)} {index}" for index in range(count)]
+
+def generate_employees(count, seed=0):
+    generator = random.Random(seed)
+    for name in employee_names(count, seed):
+        hire_date = FIRST_DATE + timedelta(days=generator.randrange(DATE_SPAN))
+        yield (
+            name, generator.choice(POSITIONS), hire_date.isoformat(), generator.choice(DEPARTMENTS),
+            '', round(generator.lognormvariate(8.5, 0.4), 2)
+        )
+
+def generate_assets(count, employee_count=1000, seed=0):
+    generator = random.Random(seed)
+    people = employee_names(employee_count, seed)
+    city_weights = zipf_weights(len(CITIES))
+    room_weights = zipf_weights(300, 0.8)
+    person_weights = zipf_weights(len(people), 0.7)
+    rooms = [str(room) for room in range(1, 301)]
+    for index in range(count):
+        received = FIRST_DATE + timedelta(days=generator.randrange(DATE_SPAN))
+        yield (
+            f"{generator.choice(BRANDS)} {generator.choice(ITEMS)} {index}",
+            f"{generator.choice(ADJECTIVES)} {generator.choice(ADJECTIVES)} item",
+            round(generator.lognormvariate(6, 1.2), 2),
+            generator.choices(people, cum_weights=person_weights)[0] if people else '',
+            generator.choice(BRANDS),
+            generator.choices(CITIES, cum_weights=city_weights)[0],
+            generator.choice(STREETS),
+            str(generator.randint(1, 60)),
+            generator.choices(rooms, cum_weights=room_weights)[0],
+            received.isoformat(),
+        )
+
+def write_csv(file_path, fields, rows):
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow(fields)
+        csv_writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic asset and employee CSV files.")
+    parser.add_argument('--assets', type=int, default=10000)
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+
+    write_csv(os.path.join(args.output_dir, 'employees.csv'), EMPLOYEE_FIELDS, generate_employees(args.employees, args.seed))
+    write_csv(os.path.join(args.output_dir, 'assets.csv'), ASSET_FIELDS, generate_assets(args.assets, args.employees, args.seed))
+
+if __name__ == '__main__':
+    main()
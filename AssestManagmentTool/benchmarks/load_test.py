@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOMS = [str(room) for room in range(100, 140)]
+CITIES = ('Krakow', 'Warsaw', 'Gdansk', 'Poznan', 'Wroclaw', 'Lodz', 'Katowice')
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            data = await reader.readexactly(size + 2)
+            if not size:
+                break
+            body += data[:-2]
+    else:
+        body = await reader.readexactly(int(headers.get('content-length') or 0))
+    return status, bytes(body)
+
+def next_request(generator, args, max_id):
+    if generator.random() >= args.write_ratio:
+        if generator.random() < 0.5:
+            return 'GET', f"/assets?limit={args.limit}&city={generator.choice(CITIES)[:3]}", None
+        return 'GET', f"/assets/{generator.randint(1, max_id)}", None
+    if generator.random() < 0.5:
+        return 'PATCH', f"/assets/{generator.randint(1, max_id)}", {'room': generator.choice(ROOMS)}
+    return 'POST', '/assets', {
+        'name': 'Load Test Scanner', 'value': '199.99', 'city': generator.choice(CITIES), 'street': 'Main',
+        'building_number': '1', 'room': generator.choice(ROOMS), 'date_received': '2024-01-15',
+    }
+
+async def client(args, max_id, seed, deadline, latencies, failures):
+    generator = random.Random(seed)
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        while time.perf_counter() < deadline:
+            method, path, payload = next_request(generator, args, max_id)
+            body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+            started = time.perf_counter()
+            writer.write(
+                f"{method} {path} HTTP/1.1\r\nHost: {args.host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+            status, _ = await read_response(reader)
+            latencies.append((method, time.perf_counter() - started))
+            if status >= 400 and status != 404:
+                failures.append(status)
+    finally:
+        writer.close()
+
+async def fetch_json(args, path):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {args.host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    _, body = await read_response(reader)
+    writer.close()
+    return json.loads(body)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+async def run_load(args):
+    count = (await fetch_json(args, '/assets/count'))['count']
+    latencies = []
+    failures = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(client(args, max(1, count), args.seed + number, deadline, latencies, failures) for number in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    server_stats = await fetch_json(args, '/stats')
+
+    print(f"{len(latencies)} requests in {elapsed:.1f}s with {args.concurrency} connections, {len(failures)} failed")
+    print(f"{len(latencies) / elapsed:.0f} requests/s")
+    for method in sorted({method for method, _ in latencies}):
+        timings = [seconds for name, seconds in latencies if name == method]
+        print(
+            f"{method:<6} {len(timings):>8}  p50 {statistics.median(timings) * 1000:7.2f} ms"
+            f"  p99 {percentile(timings, 0.99) * 1000:7.2f} ms  max {max(timings) * 1000:7.2f} ms"
+        )
+    all_timings = [seconds for _, seconds in latencies]
+    print(f"all    {len(all_timings):>8}  p50 {statistics.median(all_timings) * 1000:7.2f} ms  p99 {percentile(all_timings, 0.99) * 1000:7.2f} ms")
+    print(f"server: {server_stats['writes']} writes in {server_stats['commits']} commits ({server_stats['writes_per_commit']:.1f} per commit)")
+
+def start_server(args):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'asset_management', '--database', args.database, 'serve', '--host', args.host, '--port', str(args.port)],
+        cwd=PACKAGE_DIRECTORY, stderr=subprocess.PIPE, text=True
+    )
+    line = server.stderr.readline()
+    if not line.startswith('Serving on'):
+        server.kill()
+        raise SystemExit(f"server did not start: {line.strip() or server.stderr.read()}")
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the asset HTTP API with keep-alive connections.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--database', help="start a server on this database for the duration of the test")
+    parser.add_argument('--concurrency', type=int, default=32, help="open connections (default: %(default)s)")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds (default: %(default)s)")
+    parser.add_argument('--write-ratio', type=float, default=0.2, help="share of requests that write (default: %(default)s)")
+    parser.add_argument('--limit', type=int, default=50, help="page size of list requests (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = start_server(args) if args.database else None
+    try:
+        asyncio.run(run_load(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+if __name__ == '__main__':
+    main()
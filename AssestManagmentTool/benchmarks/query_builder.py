@@ -0,0 +1,68 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_management import database
+from asset_management.assets import ASSET_INSERT
+from asset_management.queries import build_asset_query
+from asset_management.schema import create_tables
+
+CITIES = ('Krakow', 'Warsaw', 'Gdansk', 'Poznan', 'Wroclaw', 'Lodz')
+STREETS = ('Main', 'Long', 'Market', 'Station', 'Park')
+
+def populate(row_count):
+    rows = [
+        (f"item {i}", "generated", random.randint(1, 10000), "", "", random.choice(CITIES), random.choice(STREETS),
+         str(random.randint(1, 40)), str(random.randint(1, 300)), f"20{random.randint(10, 23)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}")
+        for i in range(row_count)
+    ]
+    with database.writer() as connection:
+        connection.executemany(ASSET_INSERT, rows)
+
+def random_query_options():
+    low = random.randint(1, 9900)
+    return {
+        'sort_by': 'value',
+        'filters': {'city': random.choice(CITIES)[:3], 'room': str(random.randint(1, 300))},
+        'value_range': (str(low), str(low + 100)),
+    }
+
+def literal_query(query, parameters):
+    for parameter in parameters:
+        literal = "'" + str(parameter).replace("'", "''") + "'"
+        query = query.replace('?', literal, 1)
+    return query
+
+def run(label, statements):
+    with database.reader() as connection:
+        started = time.perf_counter()
+        for query, parameters in statements:
+            connection.execute(query, parameters).fetchall()
+        elapsed = time.perf_counter() - started
+    print(f"{label:<14} {len(statements) / elapsed:>10.0f} queries/s {elapsed / len(statements) * 1e6:>10.1f} us/query")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inlined and parameterised asset filter queries.")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database.set_database_path(os.path.join(directory, 'assets.db'))
+        create_tables()
+        populate(args.rows)
+        options = [random_query_options() for _ in range(args.queries)]
+        parameterised = [build_asset_query(**option) for option in options]
+        inlined = [(literal_query(query, parameters), ()) for query, parameters in parameterised]
+        print(f"{args.rows} assets, {args.queries} filtered queries, {len({query for query, _ in inlined})} distinct inlined statements")
+        run("inlined", inlined)
+        run("parameterised", parameterised)
+        database.close_database()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_management import database
+from asset_management import depreciation
+from asset_management.assets import ASSET_INSERT, add_asset, count_assets, display_assets, fetch_asset_page, update_asset, update_assets_where
+from asset_management.csv_io import ASSET_FIELDS, export_assets_csv, import_assets_csv
+from asset_management.employees import EMPLOYEE_INSERT
+from asset_management.money import to_cents
+from asset_management.queries import ASSET_COLUMNS, ASSET_SORT_COLUMNS
+from asset_management.result_cache import asset_cache
+from asset_management.schema import create_tables
+from datagen import generate_assets, generate_employees, write_csv
+
+DEFAULT_SIZES = (10000, 100000)
+INSERT_BATCH_SIZE = 50000
+DEPRECIATION_AS_OF = '2024-12-31'
+
+class Recorder:
+    def __init__(self, rows):
+        self.rows = rows
+        self.results = []
+
+    def measure(self, name, function, repeat=1, operations=1):
+        timings = []
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        self.results.append({
+            'name': name,
+            'rows': self.rows,
+            'repeat': repeat,
+            'operations': operations,
+            'median_seconds': median,
+            'min_seconds': min(timings),
+            'operations_per_second': operations / median if median else None,
+            'result_rows': result if isinstance(result, int) else None,
+        })
+        print(f"{self.rows:>10} {name:<40} {median * 1000:>10.2f} ms", file=sys.stderr)
+        return result
+
+    def measure_size(self, name, table):
+        with database.reader() as connection:
+            size = connection.execute(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = ?)", (table,)
+            ).fetchone()[0] or 0
+        self.results.append({'name': name, 'rows': self.rows, 'bytes': size})
+        print(f"{self.rows:>10} {name:<40} {size / 1024:>10.0f} KiB", file=sys.stderr)
+        return size
+
+def populate(rows, employees, seed):
+    with database.writer() as connection:
+        connection.executemany(EMPLOYEE_INSERT, (employee[:5] + (to_cents(employee[5]),) for employee in generate_employees(employees, seed)))
+    assets = (asset[:2] + (to_cents(asset[2]),) + asset[3:] for asset in generate_assets(rows, employees, seed))
+    while True:
+        batch = [row for _, row in zip(range(INSERT_BATCH_SIZE), assets)]
+        if not batch:
+            break
+        with database.writer() as connection:
+            connection.executemany(ASSET_INSERT, batch)
+
+def sample_asset(seed):
+    with database.reader() as connection:
+        total = connection.execute("SELECT MAX(id) FROM Assets").fetchone()[0]
+        return connection.execute(f"SELECT {ASSET_COLUMNS} FROM AssetDetails WHERE id = ?", (random.Random(seed).randint(1, total),)).fetchone()
+
+def filter_cases(asset):
+    columns = ('id',) + ASSET_FIELDS
+    sample = dict(zip(columns, asset))
+    cases = {
+        'name': {'filters': {'name': sample['name'].split()[1]}},
+        'description': {'filters': {'description': sample['description'].split()[0]}},
+        'value': {'filters': {'value': str(sample['value'])}},
+        'responsible_person': {'filters': {'responsible_person': sample['responsible_person'].split()[0]}},
+        'purchase_place': {'filters': {'purchase_place': sample['purchase_place']}},
+        'city': {'filters': {'city': sample['city'][:3]}},
+        'street': {'filters': {'street': sample['street']}},
+        'building_number': {'filters': {'building_number': sample['building_number']}},
+        'room': {'filters': {'room': sample['room']}},
+        'location': {'filters': {'city': sample['city'], 'street': sample['street'], 'building_number': sample['building_number'], 'room': sample['room']}},
+        'value_range': {'value_range': (10000, 20000)},
+        'date_range': {'date_range': ('2010-01-01', '2010-03-31')},
+    }
+    return cases
+
+def run_size(rows, args, directory):
+    recorder = Recorder(rows)
+    database.set_database_path(os.path.join(directory, f"assets-{rows}.db"))
+    create_tables()
+    recorder.measure('populate_executemany', lambda: populate(rows, args.employees, args.seed), operations=rows)
+
+    asset = sample_asset(args.seed)
+    single_inserts = min(1000, max(1, rows // 100))
+    recorder.measure('add_asset_single', lambda: [add_asset(*asset[1:]) for _ in range(single_inserts)], operations=single_inserts)
+
+    for name, options in filter_cases(asset).items():
+        recorder.measure(f"filter_{name}_count", lambda: count_assets(options.get('filters'), options.get('value_range'), options.get('date_range')), repeat=args.repeat)
+        recorder.measure(f"filter_{name}_rows", lambda: len(display_assets(None, 'ASC', options.get('filters'), options.get('value_range'), options.get('date_range'))), repeat=args.repeat)
+
+    for column in ASSET_SORT_COLUMNS:
+        recorder.measure(f"sort_{column}_first_page", lambda: len(fetch_asset_page(column, 'ASC', limit=200)), repeat=args.repeat)
+        recorder.measure(f"sort_{column}_desc_first_page", lambda: len(fetch_asset_page(column, 'DESC', limit=200)), repeat=args.repeat)
+
+    export_path = os.path.join(directory, f"export-{rows}.csv")
+    recorder.measure('csv_export', lambda: export_assets_csv(export_path), operations=rows)
+    import_path = os.path.join(directory, f"import-{rows}.csv")
+    write_csv(import_path, ASSET_FIELDS, generate_assets(rows, args.employees, args.seed + 1))
+    database.set_database_path(os.path.join(directory, f"import-{rows}.db"))
+    create_tables()
+    recorder.measure('csv_import', lambda: import_assets_csv(import_path).imported, operations=rows)
+    database.set_database_path(os.path.join(directory, f"assets-{rows}.db"))
+
+    generator = random.Random(args.seed)
+    edit_ids = [generator.randint(1, rows) for _ in range(min(1000, rows))]
+    before_edits = datetime.now().isoformat(sep=' ', timespec='milliseconds')
+    time.sleep(0.01)
+    recorder.measure('update_asset_single', lambda: [update_asset(asset_id, *asset[1:]) for asset_id in edit_ids], operations=len(edit_ids))
+
+    recorder.measure_size('storage_assets', 'Assets')
+    recorder.measure_size('storage_history', 'AssetHistory')
+    for name, as_of in (('current', None), ('now', datetime.now().isoformat(sep=' ')), ('before_edits', before_edits)):
+        recorder.measure(f"as_of_{name}_rows", lambda: len(display_assets(as_of=as_of)), repeat=args.repeat)
+        recorder.measure(f"as_of_{name}_room", lambda: len(display_assets(filters={'room': asset[9]}, as_of=as_of)), repeat=args.repeat)
+
+    depreciation.set_policy('IT', 'declining_balance', 48, 0.4, 5)
+    update_assets_where({'category': 'IT'}, {'name': 'Laptop'})
+    engines = ('python', 'sql') + (('numpy',) if depreciation.numpy is not None else ())
+    for engine in engines:
+        recorder.measure(f"depreciation_{engine}", lambda: depreciation.run_depreciation(DEPRECIATION_AS_OF, engine).assets, repeat=args.repeat, operations=rows)
+
+    database.close_database()
+    for file_name in os.listdir(directory):
+        os.remove(os.path.join(directory, file_name))
+    return recorder.results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the asset/employee data layer on synthetic data.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="asset table sizes (default: %(default)s)")
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+    # Repeated measurements would otherwise time the result cache instead of the queries.
+    asset_cache.max_bytes = 0
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.sizes:
+            results.extend(run_size(rows, args, directory))
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'arguments': vars(args),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {len(results)} measurements to {args.output}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_management import database
+from asset_management.schema import create_tables
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = str(tmp_path / 'assets.db')
+    database.set_database_path(path)
+    create_tables()
+    yield path
+    database.close_database()
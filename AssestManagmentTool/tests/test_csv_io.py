@@ -0,0 +1,25 @@
+import csv
+
+from asset_management import database
+from asset_management.assets import ASSET_INSERT
+from asset_management.csv_io import export_assets_csv
+
+ASSETS = (
+    ('Printer', '', 300, '', '', 'Krakow', 'Main', '1', '101', '2024-02-01'),
+    ('Laptop', '', 10000, '', '', 'Krakow', 'Main', '1', '102', '2023-12-31'),
+    ('Desk', '', 2000, '', '', 'Krakow', 'Main', '1', '103', '2024-01-15'),
+)
+
+def exported(tmp_path, **options):
+    path = tmp_path / 'assets.csv'
+    export_assets_csv(str(path), **options)
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return [row['name'] for row in csv.DictReader(csvfile)]
+
+def test_export_sorts_by_stored_value_and_date(database_path, tmp_path):
+    with database.writer() as connection:
+        connection.executemany(ASSET_INSERT, ASSETS)
+    assert exported(tmp_path, sort_by='value') == ['Printer', 'Desk', 'Laptop']
+    assert exported(tmp_path, sort_by='value', sort_order='DESC') == ['Laptop', 'Desk', 'Printer']
+    assert exported(tmp_path, sort_by='date_received') == ['Laptop', 'Desk', 'Printer']
+    assert exported(tmp_path, sort_by='date_received', sort_order='DESC') == ['Printer', 'Desk', 'Laptop']
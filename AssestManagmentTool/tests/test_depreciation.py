@@ -0,0 +1,47 @@
+import pytest
+
+from asset_management import database
+from asset_management.assets import ASSET_INSERT
+from asset_management.depreciation import numpy, run_depreciation, set_policy
+from asset_management.money import to_cents
+from benchmarks.datagen import generate_assets
+
+ASSET_COUNT = 5000
+AS_OF_DATES = ('2005-06-30', '2012-01-31', '2024-12-31')
+POLICIES = (
+    ('it', 'straight_line', 36, 0.0, 10.0),
+    ('furniture', 'declining_balance', 120, 0.2, 5.0),
+    ('vehicles', 'declining_balance', 96, 0.35, 0.0),
+)
+
+@pytest.fixture
+def assets(database_path):
+    for policy in POLICIES:
+        set_policy(*policy)
+    categories = [policy[0] for policy in POLICIES] + ['', 'unknown']
+    with database.writer() as connection:
+        connection.executemany(ASSET_INSERT, [(*row[:2], to_cents(str(row[2])), *row[3:]) for row in generate_assets(ASSET_COUNT, 0)])
+        connection.executemany(
+            "UPDATE Assets SET category = ? WHERE id = ?",
+            [(categories[asset_id % len(categories)], asset_id) for asset_id in range(1, ASSET_COUNT + 1)]
+        )
+        # Rows every engine must skip: a value that is not whole cents and a date that is not ISO.
+        connection.execute("UPDATE Assets SET value = 'n/a' WHERE id = 1")
+        connection.execute("UPDATE Assets SET date_received = 'unknown' WHERE id = 2")
+
+def snapshots(engine):
+    rows = {}
+    for as_of in AS_OF_DATES:
+        run_depreciation(as_of, engine, chunk_size=700)
+        with database.reader() as connection:
+            rows[as_of] = connection.execute("SELECT * FROM DepreciationSnapshots WHERE as_of = ? ORDER BY asset_id", (as_of,)).fetchall()
+    return rows
+
+def test_sql_and_python_engines_agree(assets):
+    expected = snapshots('python')
+    assert all(expected.values())
+    assert snapshots('sql') == expected
+
+@pytest.mark.skipif(numpy is None, reason="NumPy is not installed")
+def test_numpy_engine_agrees(assets):
+    assert snapshots('numpy') == snapshots('python')
@@ -0,0 +1,15 @@
+from asset_management import database
+from asset_management.directory import employee_directory
+from asset_management.employees import add_employee
+from asset_management.schema import create_tables
+
+def test_directory_follows_database_path(database_path, tmp_path):
+    add_employee('Anna Nowak', 'Engineer', '2020-01-01', 'IT', '', 400000)
+    assert employee_directory.names() == ['Anna Nowak']
+
+    database.set_database_path(str(tmp_path / 'other.db'))
+    create_tables()
+    assert employee_directory.names() == []
+    add_employee('Jan Kowalski', 'Analyst', '2021-01-01', 'Finance', '', 300000)
+    assert employee_directory.names() == ['Jan Kowalski']
+    assert employee_directory.find_id('Anna Nowak') is None
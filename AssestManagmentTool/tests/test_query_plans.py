@@ -0,0 +1,24 @@
+from asset_management import database
+from asset_management.assets import ASSET_INSERT
+from asset_management.employees import EMPLOYEE_INSERT
+from asset_management.money import to_cents
+from asset_management.queries import find_full_scans
+from benchmarks.datagen import generate_assets, generate_employees
+
+ASSET_COUNT = 20000
+EMPLOYEE_COUNT = 200
+
+def populate():
+    with database.writer() as connection:
+        connection.executemany(
+            EMPLOYEE_INSERT, [(*row[:5], to_cents(str(row[5]))) for row in generate_employees(EMPLOYEE_COUNT)]
+        )
+        connection.executemany(
+            ASSET_INSERT, [(*row[:2], to_cents(str(row[2])), *row[3:]) for row in generate_assets(ASSET_COUNT, EMPLOYEE_COUNT)]
+        )
+        connection.execute("ANALYZE")
+
+def test_checked_asset_queries_use_an_index(database_path):
+    populate()
+    with database.reader() as connection:
+        assert find_full_scans(connection) == []
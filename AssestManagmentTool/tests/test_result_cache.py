@@ -0,0 +1,31 @@
+import sqlite3
+
+from asset_management import database
+from asset_management.assets import ASSET_INSERT, count_assets, display_assets
+from asset_management.result_cache import asset_cache
+
+ASSET = ('Laptop', '', 10000, '', '', 'Krakow', 'Main', '1', '101', '2024-01-01')
+
+def test_commit_from_another_connection_expires_cached_results(database_path):
+    asset_cache.clear()
+    with database.writer() as connection:
+        connection.execute(ASSET_INSERT, ASSET)
+    assert count_assets() == 1 and len(display_assets()) == 1
+    assert count_assets() == 1
+
+    # Stands in for another process: a connection the connection manager does not know about.
+    other = sqlite3.connect(database_path)
+    with other:
+        other.execute(ASSET_INSERT, ASSET)
+    other.close()
+
+    assert count_assets() == 2 and len(display_assets()) == 2
+
+def test_own_commits_are_not_taken_for_external_ones(database_path):
+    asset_cache.clear()
+    with database.writer() as connection:
+        connection.execute(ASSET_INSERT, ASSET)
+    generation = database.current_generation()
+    with database.writer() as connection:
+        connection.execute(ASSET_INSERT, ASSET)
+    assert database.current_generation() == generation + 2
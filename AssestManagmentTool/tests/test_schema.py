@@ -0,0 +1,30 @@
+import pytest
+
+from asset_management import database, schema
+from asset_management.assets import ASSET_INSERT
+from asset_management.employees import EMPLOYEE_INSERT
+
+def test_interrupted_money_migration_does_not_scale_twice(database_path, monkeypatch):
+    with database.writer() as connection:
+        connection.executemany(ASSET_INSERT, [
+            ('Laptop', '', 1250.5, '', '', 'Krakow', 'Main', '1', '101', '2024-01-01'),
+            ('Desk', '', 300, '', '', 'Krakow', 'Main', '1', '102', '2024-01-01'),
+        ])
+        connection.execute(EMPLOYEE_INSERT, ('Anna Nowak', 'Engineer', '2020-01-01', 'IT', '', 4000))
+        connection.execute("PRAGMA user_version = 2")
+
+    migrate = schema.migrate_money_to_cents
+    def fail_on_employees(connection, table, column):
+        if table == 'Employees':
+            raise RuntimeError("interrupted")
+        migrate(connection, table, column)
+    monkeypatch.setattr(schema, 'migrate_money_to_cents', fail_on_employees)
+    with pytest.raises(RuntimeError):
+        schema.create_tables()
+    monkeypatch.undo()
+    schema.create_tables()
+
+    with database.reader() as connection:
+        assert connection.execute("SELECT value FROM Assets ORDER BY id").fetchall() == [(125050,), (30000,)]
+        assert connection.execute("SELECT salary FROM Employees").fetchall() == [(400000,)]
+        assert connection.execute("PRAGMA user_version").fetchone()[0] == 3
@@ -0,0 +1,138 @@
+import asyncio
+import json
+from functools import partial
+
+import pytest
+
+from asset_management import database
+from asset_management.assets import ASSET_INSERT, add_asset
+from asset_management.server import AssetServer, run_write_group
+
+ASSET = {
+    'name': 'Laptop', 'value': '1250.50', 'city': 'Krakow', 'street': 'Main',
+    'building_number': '1', 'room': '101', 'date_received': '2024-01-15',
+}
+
+async def send(port, raw):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status = int(head.split()[1])
+    if b'Transfer-Encoding: chunked' in head:
+        data = b''
+        while True:
+            size, _, rest = body.partition(b'\r\n')
+            size = int(size, 16)
+            if not size:
+                break
+            data += rest[:size]
+            body = rest[size + 2:]
+        body = data
+    return status, json.loads(body)
+
+def request(port, method, path, payload=None, body=None):
+    if body is None:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n"
+    return send(port, head.encode('latin-1') + body)
+
+def serve(database_path, scenario):
+    async def main():
+        ready = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(AssetServer().serve('127.0.0.1', 0, ready.set_result))
+        try:
+            return await scenario((await ready)[1])
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+    return asyncio.run(main())
+
+def test_cursor_paging_includes_null_sort_values(database_path):
+    descriptions = ['b', None, 'a', None, 'c', 'a', None]
+    with database.writer() as connection:
+        connection.executemany(ASSET_INSERT, [
+            ('Laptop', description, 100, '', '', 'Krakow', 'Main', '1', '101', '2024-01-01') for description in descriptions
+        ])
+    with database.reader() as connection:
+        expected = {
+            order: [row[0] for row in connection.execute(f"SELECT id FROM Assets ORDER BY description {order}, id {order}")]
+            for order in ('ASC', 'DESC')
+        }
+
+    async def scenario(port):
+        pages = {}
+        for order in ('ASC', 'DESC'):
+            ids, after = [], ''
+            while True:
+                status, page = await request(port, 'GET', f"/assets?sort_by=description&sort_order={order}&limit=2&after={after}")
+                assert status == 200
+                ids += [asset['id'] for asset in page['assets']]
+                if page['next'] is None:
+                    break
+                after = page['next']
+            pages[order] = ids
+        return pages
+
+    assert serve(database_path, scenario) == expected
+
+def test_write_group_rolls_back_only_the_failing_write(database_path):
+    def failing_write():
+        add_asset('Half written', None, 100, None, None, 'Krakow', 'Main', '1', '101', '2024-01-01')
+        raise ValueError("rejected")
+
+    def add(name):
+        return partial(add_asset, name, None, 100, None, None, 'Krakow', 'Main', '1', '101', '2024-01-01')
+
+    results = run_write_group([add('First'), failing_write, add('Second')])
+    assert [error is None for _, error in results] == [True, False, True]
+    assert isinstance(results[1][1], ValueError)
+    with database.reader() as connection:
+        assert connection.execute("SELECT name FROM Assets ORDER BY id").fetchall() == [('First',), ('Second',)]
+
+def test_write_group_commits_once(database_path):
+    with database.reader() as connection:
+        version = connection.execute("PRAGMA data_version").fetchone()[0]
+        run_write_group([partial(add_asset, f"Asset {number}", None, 100, None, None, 'Krakow', 'Main', '1', '101', '2024-01-01') for number in range(3)])
+        # A reader sees data_version move once per commit by another connection.
+        assert connection.execute("PRAGMA data_version").fetchone()[0] == version + 1
+        assert connection.execute("SELECT COUNT(*) FROM Assets").fetchone()[0] == 3
+
+@pytest.mark.parametrize('method, path, payload', [
+    ('POST', '/assets', {**ASSET, 'date_received': 20240115}),
+    ('POST', '/assets', {**ASSET, 'value': [1, 2]}),
+    ('POST', '/assets', {**ASSET, 'value': 'abc'}),
+    ('POST', '/assets', {**ASSET, 'city': None}),
+    ('POST', '/assets', [ASSET]),
+    ('PATCH', '/assets/1', {'room': 101}),
+    ('PATCH', '/assets/1', {'id': 5}),
+    ('GET', '/assets?after=not-a-cursor', None),
+    ('GET', '/assets?after=WzFd', None),
+])
+def test_bad_request_answers_400(database_path, method, path, payload):
+    async def scenario(port):
+        return await request(port, method, path, payload)
+
+    status, response = serve(database_path, scenario)
+    assert status == 400 and response['error']
+
+def test_bad_body_and_content_length_answer_400(database_path):
+    async def scenario(port):
+        invalid_json = await request(port, 'POST', '/assets', body=b'{"name": ')
+        bad_length = await send(port, b"POST /assets HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+        created = await request(port, 'POST', '/assets', ASSET)
+        return invalid_json[0], bad_length[0], created[0]
+
+    assert serve(database_path, scenario) == (400, 400, 201)
+
+def test_unexpected_error_answers_500(database_path, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("broken")
+    monkeypatch.setattr('asset_management.server.fetch_asset_page', broken)
+
+    async def scenario(port):
+        return (await request(port, 'GET', '/assets'))[0], (await request(port, 'GET', '/assets/count'))[0]
+
+    assert serve(database_path, scenario) == (500, 200)
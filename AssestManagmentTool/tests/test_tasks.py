@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from asset_management.tasks import TaskCancelled, TaskExecutor
+
+@pytest.fixture
+def executor():
+    executor = TaskExecutor()
+    yield executor
+    executor.shutdown()
+
+def test_result_reaches_on_done(executor):
+    results = []
+    executor.submit(sum, (1, 2, 3), on_done=results.append, on_error=pytest.fail)
+    executor.submit(sum, (4, 5), write=True, on_done=results.append, on_error=pytest.fail)
+    executor.drain()
+    assert sorted(results) == [6, 9]
+
+def test_exception_reaches_on_error(executor):
+    errors = []
+    executor.submit(int, 'not a number', on_done=pytest.fail, on_error=errors.append)
+    executor.drain()
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+
+def test_progress_is_dispatched_before_the_result(executor):
+    events = []
+    def count(limit, progress):
+        for number in range(1, limit + 1):
+            progress(number, limit)
+        return limit
+    executor.submit(
+        count, 3, with_progress=True, on_progress=lambda *progress: events.append(progress), on_done=events.append
+    )
+    executor.drain()
+    assert events == [(1, 3), (2, 3), (3, 3), 3]
+
+def test_cancelled_task_raises_task_cancelled(executor):
+    started = threading.Event()
+    errors = []
+    def work(progress):
+        started.set()
+        while True:
+            progress()
+    task = executor.submit(work, write=True, with_progress=True, on_done=pytest.fail, on_error=errors.append)
+    assert started.wait(5)
+    task.cancel()
+    executor.drain()
+    assert len(errors) == 1 and isinstance(errors[0], TaskCancelled)
+
+def test_task_cancelled_before_it_starts_never_runs(executor):
+    gate = threading.Event()
+    calls = []
+    errors = []
+    executor.submit(gate.wait, 5, write=True)
+    task = executor.submit(calls.append, 'ran', write=True, on_error=errors.append)
+    task.cancel()
+    gate.set()
+    executor.drain()
+    assert calls == [] and isinstance(errors[0], TaskCancelled)
+
+def test_failing_callback_does_not_stop_later_callbacks(executor, monkeypatch):
+    reported = []
+    monkeypatch.setattr('sys.excepthook', lambda kind, value, traceback: reported.append(value))
+    results = []
+    def fail(result):
+        raise RuntimeError(result)
+    executor.submit(str, 'first', write=True, on_done=fail)
+    executor.submit(str, 'second', write=True, on_done=results.append)
+    executor.drain()
+    assert [str(error) for error in reported] == ['first'] and results == ['second']
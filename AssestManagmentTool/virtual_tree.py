@@ -0,0 +1,145 @@
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+PAGE_SIZE = 200
+CACHED_PAGES = 20
+VISIBLE_ROWS = 25
+
+class VirtualTreeview(tk.Frame):
+    def __init__(self, master, columns, headings, count_rows, fetch_rows, sort_by=None, sort_order='ASC', page_size=PAGE_SIZE, height=VISIBLE_ROWS, total=None, format_row=None):
+        super().__init__(master)
+        self.columns = columns
+        self.headings = dict(zip(columns, headings))
+        self.count_rows = count_rows
+        self.fetch_rows = fetch_rows
+        self.format_row = format_row or tuple
+        self.sort_by = sort_by or None
+        self.sort_order = sort_order or 'ASC'
+        self.page_size = page_size
+        self.visible_rows = height
+        self.offset = 0
+        self.total = 0
+        self.pages = OrderedDict()
+        self.selected_ids = set()
+
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=height)
+        for column in columns:
+            self.tree.heading(column, text=self.headings[column], command=lambda column=column: self.sort(column))
+            self.tree.column(column, width=120)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=1)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_by(-3 if event.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda event: self.scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_by(3))
+        self.tree.bind('<Prior>', lambda event: self.scroll_by(-self.visible_rows))
+        self.tree.bind('<Next>', lambda event: self.scroll_by(self.visible_rows))
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.refresh(total=total)
+
+    def set_source(self, count_rows, fetch_rows, sort_by=None, sort_order='ASC', total=None):
+        self.count_rows = count_rows
+        self.fetch_rows = fetch_rows
+        self.sort_by = sort_by or None
+        self.sort_order = sort_order or 'ASC'
+        self.selected_ids.clear()
+        self.refresh(total=total)
+
+    def refresh(self, keep_position=False, total=None):
+        self.pages.clear()
+        self.total = self.count_rows() if total is None else total
+        if not keep_position:
+            self.offset = 0
+        self.update_headings()
+        self.render()
+
+    def sort(self, column):
+        if self.sort_by == column:
+            self.sort_order = 'DESC' if self.sort_order == 'ASC' else 'ASC'
+        else:
+            self.sort_by = column
+            self.sort_order = 'ASC'
+        self.refresh()
+
+    def update_headings(self):
+        for column in self.columns:
+            text = self.headings[column]
+            if column == self.sort_by:
+                text += " ▼" if self.sort_order == 'DESC' else " ▲"
+            self.tree.heading(column, text=text)
+
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_by(int(args[1]) * step)
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.total - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def on_resize(self, event):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        visible_rows = max(1, event.height // row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.offset = max(0, min(self.offset, self.total - visible_rows))
+            self.render()
+
+    def on_select(self, event):
+        visible = set(self.tree.get_children())
+        selected = set(self.tree.selection())
+        self.selected_ids -= {int(item) for item in visible - selected}
+        self.selected_ids |= {int(item) for item in selected}
+
+    def render(self):
+        rows = self.rows(self.offset, self.visible_rows)
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[0]), values=self.format_row(row))
+        visible_selection = [str(row[0]) for row in rows if row[0] in self.selected_ids]
+        if visible_selection:
+            self.tree.selection_set(visible_selection)
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, (self.offset + len(rows)) / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def rows(self, offset, count):
+        if count <= 0 or offset >= self.total:
+            return []
+        first_page = offset // self.page_size
+        last_page = (offset + count - 1) // self.page_size
+        rows = []
+        for index in range(first_page, last_page + 1):
+            rows.extend(self.page(index))
+        start = offset - first_page * self.page_size
+        return rows[start:start + count]
+
+    def page(self, index):
+        if index in self.pages:
+            self.pages.move_to_end(index)
+            return self.pages[index]
+        after = None
+        previous = self.pages.get(index - 1)
+        if previous and len(previous) == self.page_size:
+            last_row = previous[-1]
+            after = (last_row[self.columns.index(self.sort_by)] if self.sort_by else None, last_row[0])
+        if after is not None:
+            rows = self.fetch_rows(self.sort_by, self.sort_order, self.page_size, 0, after)
+        else:
+            rows = self.fetch_rows(self.sort_by, self.sort_order, self.page_size, index * self.page_size, None)
+        self.pages[index] = rows
+        while len(self.pages) > CACHED_PAGES:
+            self.pages.popitem(last=False)
+        return rows